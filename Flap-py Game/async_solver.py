@@ -0,0 +1,109 @@
+# made by Dark_Pho3nix
+"""
+Solver running in a worker thread, pipelined against the render loop.
+While a frame is drawn and the clock sleeps, the worker already plans the
+decision for the next frame; the game picks it up without waiting and falls
+back to a cheap rule when the plan is late.
+"""
+
+import threading
+import time
+
+from sim import PIPEGAPSIZE, PIPE_WIDTH, PLAYER_HEIGHT, PLAYER_X
+
+
+def fallback_flap(player_y, player_vel_y, pipes):
+    """Safe default: flap when falling below the middle of the next gap"""
+    target = None
+    for i in pipes.slots():
+        if pipes.x[i] + PIPE_WIDTH > PLAYER_X:  # first pipe not yet passed
+            target = pipes.lower_y[i] - PIPEGAPSIZE / 2 - PLAYER_HEIGHT / 2
+            break
+    if target is None:
+        return False
+    return bool(player_y > target) and player_vel_y >= 0
+
+
+class AsyncSolver:
+    """
+    Runs solve(playery, playerVelY, pipes, deadline) in a daemon thread.
+
+    submit(state) hands the worker the state the next decision will be
+    taken from (the sim's state right after step(), so nothing has to be
+    guessed) and returns immediately; a newer submit replaces a job that has
+    not started yet. decision() returns (flap, path) for the last submitted
+    state if the worker has finished it, otherwise fallback_flap() with an
+    empty path, counting the frame as late.
+
+    Counters: frames (decisions handed out), late (fallbacks used) and
+    dropped (jobs replaced before the worker got to them).
+    """
+
+    def __init__(self, solve, time_budget=None):
+        self.solve = solve
+        self.time_budget = time_budget  # seconds the worker may plan per job
+        self.frames = 0
+        self.late = 0
+        self.dropped = 0
+
+        self._cond = threading.Condition()
+        self._job = None       # (job_id, state) waiting for the worker
+        self._job_id = 0       # id of the last submitted state
+        self._result = None    # (job_id, flap, path) of the last finished job
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, state):
+        player_y, player_vel_y, pipes = state
+        # The sim updates its pipe ring in place; plan on a private copy
+        state = (player_y, player_vel_y, pipes.copy())
+        with self._cond:
+            if self._job is not None:
+                self.dropped += 1
+            self._job_id += 1
+            self._job = (self._job_id, state)
+            self._cond.notify()
+
+    def decision(self, state, timeout=0):
+        """
+        Plan for the last submitted state (which should be 'state'), waiting
+        at most 'timeout' seconds for it
+        """
+        with self._cond:
+            self._cond.wait_for(self._ready, timeout)
+            self.frames += 1
+            if self._ready():
+                return self._result[1], self._result[2]
+        self.late += 1
+        return fallback_flap(*state), []
+
+    def late_ratio(self):
+        return self.late / self.frames if self.frames else 0.0
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+
+    def _ready(self):
+        return self._result is not None and self._result[0] == self._job_id
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._job is not None or self._closed)
+                if self._closed:
+                    return
+                job_id, state = self._job
+                self._job = None
+
+            deadline = None
+            if self.time_budget:
+                deadline = time.perf_counter() + self.time_budget
+            flap, path = self.solve(*state, deadline=deadline)
+
+            with self._cond:
+                self._result = (job_id, flap, path)
+                self._cond.notify_all()
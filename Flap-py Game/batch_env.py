@@ -0,0 +1,205 @@
+# made by Dark_Pho3nix
+"""
+Vectorized batch of headless Flappy Bird games.
+Keeps bird and pipe state for N parallel games in NumPy arrays and advances
+all of them with one step() call, following sim.FlappySim's frame logic.
+"""
+
+import random
+
+import numpy as np
+
+from sim import (
+    SCREENWIDTH, SCREENHEIGHT, PIPEGAPSIZE, BASEY,
+    PLAYER_WIDTH, PLAYER_HEIGHT, PIPE_WIDTH, PIPE_HEIGHT, PLAYER_X,
+    PIPE_VEL_X, PLAYER_START_VEL_Y, PLAYER_MAX_VEL_Y, PLAYER_MIN_VEL_Y,
+    PLAYER_ACC_Y, PLAYER_FLAP_ACC, PIPE_SLOTS, PipeRing, pixel_collision, random_gap_y,
+)
+
+
+# =============================================================================
+# CONSTANTS
+# =============================================================================
+
+# x used for empty pipe slots: never overlaps the bird and never scores
+NO_PIPE_X = 1e9
+
+PLAYER_MID = PLAYER_X + PLAYER_WIDTH / 2
+
+# Bird animation frames in FlappySim's default order; the frame advances
+# every third step
+PLAYER_INDEX_ORDER = (0, 1, 2, 1)
+
+
+def player_index(steps):
+    """FlappySim's bird animation frame after 'steps' completed steps"""
+    advances = steps // 3
+    return np.where(advances > 0, np.take(PLAYER_INDEX_ORDER, (advances - 1) % 4), 0)
+
+
+# =============================================================================
+# BATCH ENVIRONMENT
+# =============================================================================
+
+class BatchFlappyEnv:
+    """
+    N independent Flappy Bird games stepped together.
+
+    Per-game state lives in flat arrays: player_y, player_vel_y, score,
+    frames, alive, ground_crash, and (N, PIPE_SLOTS) pipe_x / pipe_y holding
+    the lower pipes (x and top y) oldest first. The upper pipe of a pair is
+    implied by the gap: its bottom edge is pipe_y - PIPEGAPSIZE.
+
+    step(flap) applies the AI flap rule of main_game to every live game and
+    returns (state, reward, done). Finished games are frozen until they are
+    reset(). Game i draws its gaps from random.Random(seeds[i]), so it
+    flies the same course as FlappySim(seed=seeds[i]).
+
+    hitmasks follows FlappySim's. Collisions are tested as rectangles for
+    all games at once, and pixel-exact only for the games whose bird box
+    touches a pipe. With hitmasks=None the rectangles decide, which makes
+    some near misses crash: the sprites are not fully opaque.
+    """
+
+    def __init__(self, n_games, seeds=None, hitmasks=None):
+        self.n_games = n_games
+        if seeds is None:
+            seeds = np.arange(n_games)
+        self.seeds = np.asarray(seeds, dtype=np.int64).copy()
+        self.hitmasks = hitmasks
+        self.rngs = [None] * n_games
+
+        self.player_y = np.zeros(n_games, dtype=np.float64)
+        self.player_vel_y = np.zeros(n_games, dtype=np.int64)
+        self.score = np.zeros(n_games, dtype=np.int64)
+        self.frames = np.zeros(n_games, dtype=np.int64)
+        self.alive = np.zeros(n_games, dtype=bool)
+        self.ground_crash = np.zeros(n_games, dtype=bool)
+        self.pipes_spawned = np.zeros(n_games, dtype=np.int64)
+        self.pipe_x = np.full((n_games, PIPE_SLOTS), NO_PIPE_X)
+        self.pipe_y = np.zeros((n_games, PIPE_SLOTS), dtype=np.float64)
+
+    def reset(self, mask=None, seeds=None, player_y=None):
+        """
+        Start new rounds for the games selected by mask (all by default),
+        optionally with new seeds for those games.
+        """
+        idx = np.arange(self.n_games) if mask is None else np.flatnonzero(mask)
+        if seeds is not None:
+            self.seeds[idx] = seeds
+        if player_y is None:
+            player_y = int((SCREENHEIGHT - PLAYER_HEIGHT) / 2)
+
+        self.player_y[idx] = player_y
+        self.player_vel_y[idx] = PLAYER_START_VEL_Y
+        self.score[idx] = 0
+        self.frames[idx] = 0
+        self.alive[idx] = True
+        self.ground_crash[idx] = False
+
+        self.pipe_x[idx] = NO_PIPE_X
+        self.pipe_x[idx, 0] = SCREENWIDTH
+        self.pipe_x[idx, 1] = SCREENWIDTH + SCREENWIDTH / 2
+        for game in idx.tolist():
+            rng = self.rngs[game] = random.Random(int(self.seeds[game]))
+            self.pipe_y[game, 0] = random_gap_y(rng) + PIPEGAPSIZE
+            self.pipe_y[game, 1] = random_gap_y(rng) + PIPEGAPSIZE
+        self.pipes_spawned[idx] = 2
+        return self.state()
+
+    def state(self):
+        return (self.player_y, self.player_vel_y, self.pipe_x, self.pipe_y)
+
+    def step(self, flap):
+        """Advance every live game one frame. Returns (state, reward, done)"""
+        alive = self.alive
+        flap = np.broadcast_to(np.asarray(flap, dtype=bool), alive.shape)
+
+        # === PHYSICS ===
+        vel = self.player_vel_y + np.where(flap, PLAYER_FLAP_ACC, PLAYER_ACC_Y)
+        np.clip(vel, PLAYER_MIN_VEL_Y, PLAYER_MAX_VEL_Y, out=vel)
+        y = self.player_y + vel
+        self.frames += alive
+
+        # === COLLISIONS ===
+        ground = alive & (y + PLAYER_HEIGHT >= BASEY)
+        y = np.where(ground, BASEY - PLAYER_HEIGHT, y)
+        vel = np.where(ground, 0, vel)
+
+        ceiling = y <= 0
+        y = np.where(ceiling, 0, y)
+        vel = np.where(ceiling, 0, vel)
+
+        px = self.pipe_x
+        overlap_x = (px < PLAYER_X + PLAYER_WIDTH) & (PLAYER_X < px + PIPE_WIDTH)
+        yc = y[:, None]
+        overlap_y = (yc < self.pipe_y - PIPEGAPSIZE) | (yc + PLAYER_HEIGHT > self.pipe_y)
+        touching = alive[:, None] & ~ground[:, None] & overlap_x & overlap_y
+        pipe_hit = touching.any(axis=1)
+        if self.hitmasks:
+            pipe_hit[pipe_hit] = self.pixel_hits(np.flatnonzero(pipe_hit), y, touching)
+
+        crashed = ground | pipe_hit
+        live = alive & ~crashed
+
+        # === SCORING ===
+        pipe_mid = px + PIPE_WIDTH / 2
+        passed = (pipe_mid <= PLAYER_MID) & (PLAYER_MID < pipe_mid + 4)
+        reward = np.where(live, passed.sum(axis=1), 0)
+
+        # === UPDATE STATE ===
+        self.player_y = np.where(alive, y, self.player_y)
+        self.player_vel_y = np.where(alive, vel, self.player_vel_y)
+        self.score += reward
+        self.ground_crash |= ground
+        self.alive = live
+
+        self.pipe_x = np.where(live[:, None] & (px < NO_PIPE_X), px + PIPE_VEL_X, px)
+
+        spawn = np.flatnonzero(live & (0 < self.pipe_x[:, 0]) & (self.pipe_x[:, 0] < 5))
+        if spawn.size:
+            slot = (self.pipe_x[spawn] < NO_PIPE_X).sum(axis=1)
+            gap_y = np.array([random_gap_y(self.rngs[game]) for game in spawn.tolist()])
+            self.pipe_x[spawn, slot] = SCREENWIDTH + 10
+            self.pipe_y[spawn, slot] = gap_y + PIPEGAPSIZE
+            self.pipes_spawned[spawn] += 1
+
+        retire = np.flatnonzero(live & (self.pipe_x[:, 0] < -PIPE_WIDTH))
+        if retire.size:
+            self.pipe_x[retire, :-1] = self.pipe_x[retire, 1:]
+            self.pipe_y[retire, :-1] = self.pipe_y[retire, 1:]
+            self.pipe_x[retire, -1] = NO_PIPE_X
+
+        return self.state(), reward, ~self.alive
+
+    def pixel_hits(self, games, y, touching):
+        """
+        Pixel-exact check of the rectangle hits of 'games': for each, True
+        if the bird's hitmask overlaps a pipe whose box it touches
+        """
+        indices = player_index(self.frames[games] - 1).tolist()
+        player_masks = self.hitmasks['player']
+        upper_mask, lower_mask = self.hitmasks['pipe']
+        hits = []
+        for game, index in zip(games.tolist(), indices):
+            player_rect = (PLAYER_X, int(y[game]), PLAYER_WIDTH, PLAYER_HEIGHT)
+            hit = False
+            for slot in np.flatnonzero(touching[game]).tolist():
+                x = int(self.pipe_x[game, slot])
+                lower_y = int(self.pipe_y[game, slot])
+                upper_rect = (x, lower_y - PIPEGAPSIZE - PIPE_HEIGHT, PIPE_WIDTH, PIPE_HEIGHT)
+                lower_rect = (x, lower_y, PIPE_WIDTH, PIPE_HEIGHT)
+                if pixel_collision(player_rect, upper_rect, player_masks[index], upper_mask) or \
+                        pixel_collision(player_rect, lower_rect, player_masks[index], lower_mask):
+                    hit = True
+                    break
+            hits.append(hit)
+        return hits
+
+    def pipes(self, game):
+        """Pipes of one game as the sim.PipeRing the solvers consume"""
+        pipes = PipeRing(PIPE_SLOTS)
+        for x, y in zip(self.pipe_x[game], self.pipe_y[game]):
+            if x < NO_PIPE_X:
+                pipes.append(x, y - PIPEGAPSIZE)
+        return pipes
@@ -0,0 +1,199 @@
+# made by Dark_Pho3nix
+"""
+Solver benchmark.
+Plays a fixed corpus of pipe layouts headlessly with each solver backend
+and reports survival, scores, per-call solve latency and memory allocated
+per call as JSON, so runs from different commits can be compared.
+
+Usage:
+    python benchmark.py --solvers beam dp --frames 2000 --output bench.json
+"""
+
+import argparse
+import json
+import platform
+import random
+import statistics
+import subprocess
+import time
+import tracemalloc
+
+import mpc
+from replay import load_hitmasks
+from sim import FlappySim, BASEY, PIPEGAPSIZE
+
+
+# =============================================================================
+# CORPUS
+# =============================================================================
+
+GAP_Y_RANGE = int(BASEY * 0.6 - PIPEGAPSIZE)
+
+
+class ZigzagRandom(random.Random):
+    """
+    Pipe RNG for worst-case layouts: every gap is at least min_jump pixels
+    above or below the previous one, alternating direction
+    """
+
+    def __init__(self, seed, min_jump):
+        super().__init__(seed)
+        self.min_jump = min(min_jump, GAP_Y_RANGE // 2)
+        self.prev = None
+        self.up = True
+
+    def randrange(self, start, stop=None, step=1):
+        low, high = (0, start) if stop is None else (start, stop)
+        if self.prev is None:
+            gap = super().randrange(low, high)
+        else:
+            higher = (low, self.prev - self.min_jump + 1)   # gap moves up
+            lower = (self.prev + self.min_jump, high)       # gap moves down
+            first, second = (higher, lower) if self.up else (lower, higher)
+            bounds = first if first[0] < first[1] else second
+            gap = super().randrange(*bounds) if bounds[0] < bounds[1] else super().randrange(low, high)
+        self.up = not self.up
+        self.prev = gap
+        return gap
+
+
+def build_corpus(n_seeds):
+    """(name, rng factory) pairs: n_seeds random layouts plus worst cases"""
+    corpus = [('seed-%d' % seed, lambda seed=seed: random.Random(seed))
+              for seed in range(n_seeds)]
+    corpus += [('zigzag-%d' % jump, lambda jump=jump: ZigzagRandom(jump, jump))
+               for jump in (80, 120, 160)]
+    return corpus
+
+
+# =============================================================================
+# MEASUREMENT
+# =============================================================================
+
+def percentiles(values):
+    values = sorted(values)
+    if not values:
+        return {}
+    pick = lambda q: values[min(len(values) - 1, int(q * len(values)))]
+    return {
+        'mean': statistics.mean(values),
+        'p50': pick(0.50),
+        'p99': pick(0.99),
+        'max': values[-1],
+    }
+
+
+def play_game(solver_name, make_rng, max_frames, hitmasks, alloc_calls, solver_kwargs=None):
+    """
+    One headless game. The first alloc_calls solves run under tracemalloc
+    (and are left out of the latency figures) to measure the peak memory
+    allocated during a call and what it still holds afterwards.
+    solver_kwargs are passed to the solver's constructor.
+    """
+    solver = mpc.SOLVERS[solver_name](**(solver_kwargs or {}))
+    sim = FlappySim(rng=make_rng(), hitmasks=hitmasks)
+    state = sim.reset()
+
+    latencies = []
+    alloc_peak = []
+    alloc_retained = []
+    done = False
+    while not done and sim.frame < max_frames:
+        if len(alloc_peak) < alloc_calls:
+            tracemalloc.start()
+            before, _ = tracemalloc.get_traced_memory()
+            flap, _ = solver.solve(*state)
+            after, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            alloc_peak.append(peak - before)
+            alloc_retained.append(after - before)
+        else:
+            start = time.perf_counter()
+            flap, _ = solver.solve(*state)
+            latencies.append(time.perf_counter() - start)
+        state, _, done = sim.step(flap)
+
+    return {
+        'frames': sim.frame,
+        'score': sim.score,
+        'survived': not done,
+        'crash': None if not done else ('ground' if sim.crash_info['groundCrash'] else 'pipe'),
+        'latencies': latencies,
+        'alloc_peak': alloc_peak,
+        'alloc_retained': alloc_retained,
+    }
+
+
+def run_benchmark(solvers, n_seeds=10, max_frames=2000, alloc_calls=20):
+    hitmasks = load_hitmasks(0, 0)
+    corpus = build_corpus(n_seeds)
+    results = {}
+    for solver_name in solvers:
+        games = {}
+        latencies, alloc_peak, alloc_retained = [], [], []
+        for name, make_rng in corpus:
+            game = play_game(solver_name, make_rng, max_frames, hitmasks, alloc_calls)
+            latencies += game.pop('latencies')
+            alloc_peak += game.pop('alloc_peak')
+            alloc_retained += game.pop('alloc_retained')
+            games[name] = game
+
+        scores = [game['score'] for game in games.values()]
+        results[solver_name] = {
+            'survival_rate': sum(game['survived'] for game in games.values()) / len(games),
+            'score': dict(percentiles(scores), min=min(scores)),
+            'latency_ms': {k: v * 1e3 for k, v in percentiles(latencies).items()},
+            'calls': len(latencies),
+            'alloc_peak_bytes_per_call': percentiles(alloc_peak),
+            'alloc_retained_bytes_per_call': percentiles(alloc_retained),
+            'games': games,
+        }
+    return results
+
+
+def git_commit():
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'],
+                             capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# =============================================================================
+# COMMAND LINE
+# =============================================================================
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the Flap-py solvers')
+    parser.add_argument('--solvers', nargs='+', default=['beam', 'dp'],
+                        choices=sorted(mpc.SOLVERS))
+    parser.add_argument('--seeds', type=int, default=10,
+                        help='random pipe layouts in the corpus (worst cases are always added)')
+    parser.add_argument('--frames', type=int, default=2000,
+                        help='frame cap per game; games reaching it count as survived')
+    parser.add_argument('--alloc-calls', type=int, default=20,
+                        help='solve calls per game measured with tracemalloc')
+    parser.add_argument('--output', default=None, help='write the JSON here instead of stdout')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    report = {
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'config': {'seeds': args.seeds, 'frames': args.frames, 'alloc_calls': args.alloc_calls},
+        'solvers': run_benchmark(args.solvers, args.seeds, args.frames, args.alloc_calls),
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+    return report
+
+
+if __name__ == '__main__':
+    main()
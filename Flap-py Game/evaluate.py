@@ -0,0 +1,204 @@
+# made by Dark_Pho3nix
+"""
+Parallel evaluation harness.
+Fans seeded headless games out over a process pool (one worker per core),
+streams each finished game back as it completes and aggregates score
+histograms, crash causes and solve-time statistics over all of them.
+
+Usage:
+    python evaluate.py --solver beam --games 1000 --output eval.json
+"""
+
+import argparse
+from collections import Counter
+import json
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+import mpc
+from benchmark import git_commit, play_game
+from replay import load_hitmasks
+
+
+# Solve times are histogrammed in buckets of this many milliseconds, so
+# workers send back a few dozen counts per game instead of every sample
+LATENCY_BUCKET_MS = 0.1
+
+
+# =============================================================================
+# WORKER
+# =============================================================================
+
+_hitmasks = None
+
+
+def _init_worker():
+    global _hitmasks
+    _hitmasks = load_hitmasks(0, 0)
+
+
+def play_seed(job):
+    """Plays one seeded game in a worker; returns a small picklable summary"""
+    solver_name, seed, max_frames, solver_kwargs = job
+    game = play_game(solver_name, lambda: random.Random(seed), max_frames, _hitmasks, 0,
+                     solver_kwargs)
+    latencies = game.pop('latencies')
+    game['seed'] = seed
+    game['solve_calls'] = len(latencies)
+    game['solve_total'] = sum(latencies)
+    game['solve_max'] = max(latencies, default=0.0)
+    game['solve_hist'] = Counter(int(t * 1e3 / LATENCY_BUCKET_MS) for t in latencies)
+    del game['alloc_peak'], game['alloc_retained']
+    return game
+
+
+# =============================================================================
+# AGGREGATION
+# =============================================================================
+
+class Summary:
+    """Running totals over finished games; add() one game at a time"""
+
+    def __init__(self, score_bucket=10):
+        self.score_bucket = score_bucket
+        self.games = 0
+        self.frames = 0
+        self.survived = 0
+        self.scores = Counter()
+        self.crashes = Counter()
+        self.solve_calls = 0
+        self.solve_total = 0.0
+        self.solve_max = 0.0
+        self.solve_hist = Counter()
+
+    def add(self, game):
+        self.games += 1
+        self.frames += game['frames']
+        self.survived += game['survived']
+        self.scores[game['score']] += 1
+        self.crashes[game['crash'] or 'survived'] += 1
+        self.solve_calls += game['solve_calls']
+        self.solve_total += game['solve_total']
+        self.solve_max = max(self.solve_max, game['solve_max'])
+        self.solve_hist.update(game['solve_hist'])
+
+    def score_histogram(self):
+        hist = Counter()
+        for score, count in self.scores.items():
+            hist[score // self.score_bucket * self.score_bucket] += count
+        return {'%d-%d' % (low, low + self.score_bucket - 1): hist[low] for low in sorted(hist)}
+
+    def solve_percentile(self, q):
+        """Upper edge (ms) of the latency bucket holding the q-th quantile"""
+        rank = q * self.solve_calls
+        seen = 0
+        for bucket in sorted(self.solve_hist):
+            seen += self.solve_hist[bucket]
+            if seen >= rank:
+                return (bucket + 1) * LATENCY_BUCKET_MS
+        return 0.0
+
+    def to_dict(self):
+        n = sum(self.scores.values())
+        scores = sorted(self.scores.elements())
+        return {
+            'games': self.games,
+            'frames': self.frames,
+            'survival_rate': self.survived / self.games if self.games else 0.0,
+            'score': {
+                'mean': sum(scores) / n if n else 0.0,
+                'p50': scores[n // 2] if n else 0,
+                'min': scores[0] if n else 0,
+                'max': scores[-1] if n else 0,
+                'histogram': self.score_histogram(),
+            },
+            'crashes': dict(self.crashes),
+            'solve_ms': {
+                'calls': self.solve_calls,
+                'mean': self.solve_total * 1e3 / self.solve_calls if self.solve_calls else 0.0,
+                'p50': self.solve_percentile(0.50),
+                'p99': self.solve_percentile(0.99),
+                'max': self.solve_max * 1e3,
+            },
+        }
+
+
+# =============================================================================
+# DRIVER
+# =============================================================================
+
+def make_pool(workers=None):
+    """Worker pool for play_seed jobs (default: one process per core)"""
+    return multiprocessing.Pool(workers or os.cpu_count() or 1, initializer=_init_worker)
+
+
+def evaluate(solver_name, seeds, max_frames=2000, workers=None, score_bucket=10, on_game=None,
+             solver_kwargs=None):
+    """
+    Plays one game per seed on a pool of workers (default: one per core)
+    and returns (Summary, elapsed seconds). on_game(game) is called in the
+    parent for every game as soon as it finishes, in completion order.
+    """
+    jobs = [(solver_name, seed, max_frames, solver_kwargs) for seed in seeds]
+    summary = Summary(score_bucket)
+    start = time.perf_counter()
+    with make_pool(workers) as pool:
+        # chunksize 1 keeps the stream live and balances long and short games
+        for game in pool.imap_unordered(play_seed, jobs, chunksize=1):
+            summary.add(game)
+            if on_game:
+                on_game(game)
+    return summary, time.perf_counter() - start
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Evaluate a Flap-py solver on many seeded games')
+    parser.add_argument('--solver', default='beam', choices=sorted(mpc.SOLVERS))
+    parser.add_argument('--games', type=int, default=1000)
+    parser.add_argument('--first-seed', type=int, default=0)
+    parser.add_argument('--frames', type=int, default=2000,
+                        help='frame cap per game; games reaching it count as survived')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='worker processes (default: number of cores)')
+    parser.add_argument('--score-bucket', type=int, default=10, help='score histogram bucket width')
+    parser.add_argument('--output', default=None, help='also write the JSON summary here')
+    parser.add_argument('--quiet', action='store_true', help="don't print a line per game")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    seeds = range(args.first_seed, args.first_seed + args.games)
+
+    def on_game(game):
+        if not args.quiet:
+            print('seed %d: score %d, %d frames, %s' % (
+                game['seed'], game['score'], game['frames'], game['crash'] or 'survived'),
+                file=sys.stderr, flush=True)
+
+    workers = args.workers or os.cpu_count() or 1
+    summary, elapsed = evaluate(args.solver, seeds, args.frames, workers,
+                                args.score_bucket, on_game)
+    report = {
+        'commit': git_commit(),
+        'solver': args.solver,
+        'config': {'games': args.games, 'first_seed': args.first_seed,
+                   'frames': args.frames, 'workers': workers},
+        'elapsed': elapsed,
+        'games_per_second': summary.games / elapsed if elapsed else 0.0,
+        'frames_per_second': summary.frames / elapsed if elapsed else 0.0,
+        'summary': summary.to_dict(),
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    print(text)
+    return report
+
+
+if __name__ == '__main__':
+    main()
@@ -5,10 +5,20 @@ A Flappy Bird clone featuring both manual play and AI-controlled gameplay
 using Model Predictive Control with Mixed Integer Programming.
 """
 
+from async_solver import AsyncSolver
 from itertools import cycle
-from mip import solve
+from mpc import solve
+from population import SOLVE_BUDGET, Controller, PopulationSim, parse_controller
+from renderer import DirtyRenderer
+from replay import Replay
+from sim import (FlappySim, PLAYER_ROT_THR, PLAYER_X, PLAYERS_LIST, BACKGROUNDS_LIST,
+                 PIPES_LIST)
+import argparse
+import functools
+import mpc
 import random
 import sys
+import time
 
 import pygame
 from pygame.locals import *
@@ -35,63 +45,104 @@ COLOR_FLAPPY_BRONZE = (207, 187, 139)
 COLOR_FLAPPY_SILVER = (231, 231, 231)
 COLOR_FLAPPY_GOLD = (231, 175, 80)
 
-# Asset paths
-PLAYERS_LIST = (
-    ('assets/sprites/redbird-upflap.png',
-     'assets/sprites/redbird-midflap.png',
-     'assets/sprites/redbird-downflap.png'),
-    ('assets/sprites/bluebird-upflap.png',
-     'assets/sprites/bluebird-midflap.png',
-     'assets/sprites/bluebird-downflap.png'),
-    ('assets/sprites/yellowbird-upflap.png',
-     'assets/sprites/yellowbird-midflap.png',
-     'assets/sprites/yellowbird-downflap.png'),
-)
-
-BACKGROUNDS_LIST = (
-    'assets/sprites/background-day.png',
-    'assets/sprites/background-night.png',
-)
-
-PIPES_LIST = (
-    'assets/sprites/pipe-green.png',
-    'assets/sprites/pipe-red.png',
-)
+# Scoreboard color of each bird in sim.PLAYERS_LIST
+BIRD_COLORS = (COLOR_FLAPPY_ORANGE, COLOR_FLAPPY_BLUE, COLOR_FLAPPY_YELLOW)
 
 # Global resources
 IMAGES = {}
 SOUNDS = {}
 HITMASKS = {}
+# Every background/bird/pipe variant and its hitmasks, decoded once per process
+SPRITES = {}
+SPRITE_HITMASKS = {}
+# (background, player, pipe) indices of the current theme
+THEME = (0, 0, 0)
 SCREEN = None
+RENDERER = None
 FPSCLOCK = None
 HIGH_SCORE = 0
 
+# Fraction of each frame the AI may spend planning (None = fixed-size search)
+AI_TIME_BUDGET = None
+# Plan in a worker thread one frame ahead instead of blocking the frame
+AI_ASYNC = False
+
+# AI birds flown at once on one course (0 = the usual single bird), split
+# across CONTROLLERS (population.Controller)
+POPULATION = 0
+CONTROLLERS = []
+
+# Directory every round is saved to as a replay (None = don't record)
+RECORD_DIR = 'replays'
+
+# Game frames simulated per real frame interval (0 = as fast as possible)
+SIM_SPEED = 1
+# Draw every k-th game frame (0 = don't draw while playing)
+RENDER_EVERY = 1
+
+# LRU cache sizes for fonts (one per size) and finished outlined-text surfaces
+FONT_CACHE_SIZE = 16
+TEXT_CACHE_SIZE = 128
+# Rotated bird sprites: 9 bird frames x the ~40 angles the game uses
+ROTATION_CACHE_SIZE = 512
+
 
 # =============================================================================
 # TEXT RENDERING (Flappy Bird Style - outlined text)
 # =============================================================================
 
-def draw_text_outlined(surface, text, font_size, x, y, main_color, outline_color=COLOR_FLAPPY_BLACK, center=True):
-    """Draw text with outline effect like original Flappy Bird"""
-    font = pygame.font.Font(None, font_size)
-    
-    # Draw outline (render text in 8 directions)
-    outline_positions = [(-2, -2), (-2, 0), (-2, 2), (0, -2), (0, 2), (2, -2), (2, 0), (2, 2)]
+@functools.lru_cache(maxsize=FONT_CACHE_SIZE)
+def get_font(font_size):
+    """Default font at one size, created once"""
+    return pygame.font.Font(None, font_size)
+
+
+@functools.lru_cache(maxsize=TEXT_CACHE_SIZE)
+def render_text_outlined(text, font_size, main_color, outline_color):
+    """Outlined text composited into one transparent surface (2px outline on each side)"""
+    font = get_font(font_size)
     outline_surf = font.render(text, True, outline_color)
+    text_surf = font.render(text, True, main_color)
     
-    if center:
-        base_rect = outline_surf.get_rect(center=(x, y))
-    else:
-        base_rect = outline_surf.get_rect(topleft=(x, y))
+    width, height = outline_surf.get_size()
+    composite = pygame.Surface((width + 4, height + 4), pygame.SRCALPHA)
     
+    # Draw outline (render text in 8 directions)
+    outline_positions = [(-2, -2), (-2, 0), (-2, 2), (0, -2), (0, 2), (2, -2), (2, 0), (2, 2)]
     for dx, dy in outline_positions:
-        surface.blit(outline_surf, (base_rect.x + dx, base_rect.y + dy))
+        composite.blit(outline_surf, (2 + dx, 2 + dy))
     
     # Draw main text
-    text_surf = font.render(text, True, main_color)
-    surface.blit(text_surf, base_rect)
+    composite.blit(text_surf, (2, 2))
+    return composite
+
+
+def text_cache_stats():
+    """Hit/miss counts of the font and text surface caches"""
+    stats = {}
+    for name, cache in (('font', get_font), ('text', render_text_outlined)):
+        info = cache.cache_info()
+        stats[name] = {'hits': info.hits, 'misses': info.misses,
+                       'size': info.currsize, 'maxsize': info.maxsize}
+    return stats
+
+
+def draw_text_outlined(surface, text, font_size, x, y, main_color,
+                       outline_color=COLOR_FLAPPY_BLACK, center=True, max_width=None):
+    """Draw text with outline effect like original Flappy Bird, cut off at max_width"""
+    text_surf = render_text_outlined(text, font_size, main_color, outline_color)
+    if max_width is not None and text_surf.get_width() > max_width:
+        text_surf = text_surf.subsurface((0, 0, max_width, text_surf.get_height()))
+    
+    # Position as the bare text would be, the outline hangs 2px outside it
+    text_rect = text_surf.get_rect().inflate(-4, -4)
+    if center:
+        text_rect.center = (x, y)
+    else:
+        text_rect.topleft = (x, y)
     
-    return base_rect
+    surface.blit(text_surf, (text_rect.x - 2, text_rect.y - 2))
+    return text_rect
 
 
 def draw_score_sprites(surface, score, y_pos=None):
@@ -104,7 +155,7 @@ def draw_score_sprites(surface, score, y_pos=None):
         y_pos = SCREENHEIGHT * 0.1
     
     for digit in score_digits:
-        SCREEN.blit(IMAGES['numbers'][digit], (x_offset, y_pos))
+        surface.blit(IMAGES['numbers'][digit], (x_offset, y_pos))
         x_offset += IMAGES['numbers'][digit].get_width()
 
 
@@ -169,17 +220,17 @@ def show_title_screen():
         base_x = -((-base_x + 2) % base_shift)
         
         # === RENDERING ===
-        SCREEN.blit(IMAGES['background'], (0, 0))
+        RENDERER.begin(IMAGES['background'])
         
         # Title using message sprite position area
-        draw_text_outlined(SCREEN, "FLAPPY BIRD", 52, SCREENWIDTH // 2, 80, 
+        draw_text_outlined(RENDERER, "FLAPPY BIRD", 52, SCREENWIDTH // 2, 80, 
                           COLOR_FLAPPY_YELLOW)
-        draw_text_outlined(SCREEN, "AI Edition", 32, SCREENWIDTH // 2, 115, 
+        draw_text_outlined(RENDERER, "AI Edition", 32, SCREENWIDTH // 2, 115, 
                           COLOR_FLAPPY_WHITE)
         
         # Bird mascot
         bird_y = player_y + bird_shm['val']
-        SCREEN.blit(IMAGES['player'][player_index], (player_x, bird_y))
+        RENDERER.blit(IMAGES['player'][player_index], (player_x, bird_y))
         
         # Mode selection
         manual_color = COLOR_FLAPPY_YELLOW if selected == 0 else COLOR_FLAPPY_WHITE
@@ -188,28 +239,28 @@ def show_title_screen():
         # Selection arrow (blinking)
         show_arrow = (blink_timer // 10) % 2 == 0
         
-        draw_text_outlined(SCREEN, "SELECT MODE", 28, SCREENWIDTH // 2, 280, 
+        draw_text_outlined(RENDERER, "SELECT MODE", 28, SCREENWIDTH // 2, 280, 
                           COLOR_FLAPPY_ORANGE)
         
         # Manual option
         if selected == 0 and show_arrow:
-            draw_text_outlined(SCREEN, ">", 32, 45, 320, COLOR_FLAPPY_YELLOW)
-        draw_text_outlined(SCREEN, "[M] MANUAL", 32, SCREENWIDTH // 2, 320, manual_color)
+            draw_text_outlined(RENDERER, ">", 32, 45, 320, COLOR_FLAPPY_YELLOW)
+        draw_text_outlined(RENDERER, "[M] MANUAL", 32, SCREENWIDTH // 2, 320, manual_color)
         
         # AI option  
         if selected == 1 and show_arrow:
-            draw_text_outlined(SCREEN, ">", 32, 65, 360, COLOR_FLAPPY_BLUE)
-        draw_text_outlined(SCREEN, "[A] AI", 32, SCREENWIDTH // 2, 360, ai_color)
+            draw_text_outlined(RENDERER, ">", 32, 65, 360, COLOR_FLAPPY_BLUE)
+        draw_text_outlined(RENDERER, "[A] AI", 32, SCREENWIDTH // 2, 360, ai_color)
         
         # High score
         if HIGH_SCORE > 0:
-            draw_text_outlined(SCREEN, f"BEST: {HIGH_SCORE}", 24, SCREENWIDTH // 2, 420, 
+            draw_text_outlined(RENDERER, f"BEST: {HIGH_SCORE}", 24, SCREENWIDTH // 2, 420, 
                               COLOR_FLAPPY_GOLD)
         
         # Base
-        SCREEN.blit(IMAGES['base'], (base_x, BASEY))
+        RENDERER.blit(IMAGES['base'], (base_x, BASEY))
         
-        pygame.display.update()
+        RENDERER.end()
         FPSCLOCK.tick(FPS)
 
 
@@ -259,69 +310,88 @@ def show_get_ready_screen(game_mode):
         player_shm['val'] += player_shm['dir']
         
         # === RENDERING ===
-        SCREEN.blit(IMAGES['background'], (0, 0))
-        SCREEN.blit(IMAGES['player'][player_index],
+        RENDERER.begin(IMAGES['background'])
+        RENDERER.blit(IMAGES['player'][player_index],
                    (player_x, player_y + player_shm['val']))
-        SCREEN.blit(IMAGES['message'], (message_x, message_y))
+        RENDERER.blit(IMAGES['message'], (message_x, message_y))
         
         # Mode indicator (small, top corner)
         if game_mode == 'ai':
-            draw_text_outlined(SCREEN, "AI", 28, 30, 20, COLOR_FLAPPY_BLUE, center=False)
+            draw_text_outlined(RENDERER, "AI", 28, 30, 20, COLOR_FLAPPY_BLUE, center=False)
         else:
-            draw_text_outlined(SCREEN, "MANUAL", 22, 10, 20, COLOR_FLAPPY_YELLOW, center=False)
+            draw_text_outlined(RENDERER, "MANUAL", 22, 10, 20, COLOR_FLAPPY_YELLOW, center=False)
         
-        SCREEN.blit(IMAGES['base'], (base_x, BASEY))
+        RENDERER.blit(IMAGES['base'], (base_x, BASEY))
         
-        pygame.display.update()
+        RENDERER.end()
         FPSCLOCK.tick(FPS)
 
 
+# =============================================================================
+# FIXED TIMESTEP
+# =============================================================================
+
+class FixedTimestep:
+    """
+    Paces game frames of 1/fps seconds against the wall clock, 'speed'
+    times faster than real time (0 = no pacing at all). wait() is called once
+    per simulated frame and sleeps only while the simulation is ahead, so
+    how often frames are drawn doesn't change the game speed. Falling more
+    than max_lag seconds behind drops the backlog instead of racing to
+    catch up.
+    """
+    
+    def __init__(self, fps, speed=1, max_lag=0.25):
+        self.step = 1.0 / fps
+        self.speed = speed
+        self.max_lag = max_lag
+        self.accumulator = 0.0  # game time the real clock is ahead by
+        self.last = time.perf_counter()
+    
+    def wait(self):
+        if not self.speed:
+            return
+        now = time.perf_counter()
+        self.accumulator += (now - self.last) * self.speed - self.step
+        self.last = now
+        if self.accumulator < 0:
+            time.sleep(-self.accumulator / self.speed)
+        elif self.accumulator > self.max_lag * self.speed:
+            self.accumulator = 0.0
+
+
 # =============================================================================
 # MAIN GAME LOOP
 # =============================================================================
 
 def main_game(movement_info, game_mode='ai'):
-    """Main gameplay loop"""
-    score = 0
-    player_index = 0
-    loop_iter = 0
+    """Main gameplay loop - renders a FlappySim round frame by frame"""
+    # Each round draws its pipes from its own seeded RNG and fixes the phase
+    # of the bird animation, so a replay can reproduce it exactly
+    round_seed = random.getrandbits(32)
     player_index_gen = movement_info['playerIndexGen']
-    player_x = int(SCREENWIDTH * 0.2)
-    player_y = movement_info['playery']
+    index_order = tuple(next(player_index_gen) for _ in range(4))
     
-    base_x = movement_info['basex']
-    base_shift = IMAGES['base'].get_width() - IMAGES['background'].get_width()
-    
-    # Generate pipes
-    new_pipe1 = get_random_pipe()
-    new_pipe2 = get_random_pipe()
-    
-    upper_pipes = [
-        {'x': SCREENWIDTH, 'y': new_pipe1[0]['y']},
-        {'x': SCREENWIDTH + SCREENWIDTH / 2, 'y': new_pipe2[0]['y']},
-    ]
-    lower_pipes = [
-        {'x': SCREENWIDTH, 'y': new_pipe1[1]['y']},
-        {'x': SCREENWIDTH + SCREENWIDTH / 2, 'y': new_pipe2[1]['y']},
-    ]
-    
-    pipe_vel_x = -4
-    
-    # Physics
-    player_vel_y = -9
-    player_max_vel_y = 10
-    player_min_vel_y = -8
-    player_acc_y = 1
-    player_rot = 45
-    player_vel_rot = 3
-    player_rot_thr = 20
-    player_flap_acc = -14
-    player_flapped = False
+    sim = FlappySim(seed=round_seed, game_mode=game_mode, hitmasks=HITMASKS)
+    sim.reset(player_y=movement_info['playery'], base_x=movement_info['basex'],
+              player_index_gen=cycle(index_order))
     
     traj = []
+    flaps = []
+    
+    planner = None
+    if game_mode == 'ai' and AI_ASYNC:
+        budget = AI_TIME_BUDGET / FPS if AI_TIME_BUDGET else None
+        planner = AsyncSolver(solve, time_budget=budget)
+        planner.submit(sim.state())
+    
+    # Game time advances by fixed 1/FPS steps whatever the speed and render
+    # rate, so turbo runs replay normal-speed runs exactly
+    pacer = FixedTimestep(FPS, SIM_SPEED)
     
     while True:
         # === INPUT ===
+        flap = False
         for event in pygame.event.get():
             if event.type == QUIT or (event.type == KEYDOWN and event.key == K_ESCAPE):
                 pygame.quit()
@@ -329,111 +399,181 @@ def main_game(movement_info, game_mode='ai'):
             
             if game_mode == 'manual':
                 if event.type == KEYDOWN and event.key in (K_SPACE, K_UP, K_w):
-                    if player_y > -2 * IMAGES['player'][0].get_height():
-                        player_vel_y = player_flap_acc
-                        player_flapped = True
-                        SOUNDS['wing'].play()
+                    flap = True
         
         # === AI CONTROL ===
-        if game_mode == 'ai':
-            flap, traj = solve(player_y, player_vel_y, lower_pipes)
-            if flap:
-                player_vel_y += player_flap_acc
-                player_flapped = True
-                SOUNDS['wing'].play()
+        if planner:
+            # Nothing is on screen before the first frame, so it may wait
+            flap, traj = planner.decision(sim.state(), timeout=None if sim.frame == 0 else 0)
+        elif game_mode == 'ai':
+            deadline = None
+            if AI_TIME_BUDGET:
+                deadline = time.perf_counter() + AI_TIME_BUDGET / FPS
+            flap, traj = solve(*sim.state(), deadline=deadline)
         else:
             traj = []
         
-        # === PHYSICS ===
-        if player_rot > -90:
-            player_rot -= player_vel_rot
-        
-        if not player_flapped:
-            player_vel_y += player_acc_y
-        
-        if player_flapped:
-            player_flapped = False
-            player_rot = 45
-        
-        player_vel_y = max(player_min_vel_y, min(player_max_vel_y, player_vel_y))
-        player_height = IMAGES['player'][player_index].get_height()
-        player_y += player_vel_y
-        
-        # === COLLISIONS ===
-        if player_y + player_height >= BASEY:
-            player_y = BASEY - player_height
-            return create_crash_info(player_y, True, base_x, upper_pipes, 
-                                    lower_pipes, score, 0, player_rot)
-        
-        if player_y <= 0:
-            player_y = 0
-            player_vel_y = 0
-        
-        crash = check_crash({'x': player_x, 'y': player_y, 'index': player_index},
-                           upper_pipes, lower_pipes)
-        if crash[0]:
-            return create_crash_info(player_y, crash[1], base_x, upper_pipes,
-                                    lower_pipes, score, player_vel_y, player_rot)
-        
-        # === SCORING ===
-        player_mid = player_x + IMAGES['player'][0].get_width() / 2
-        for pipe in upper_pipes:
-            pipe_mid = pipe['x'] + IMAGES['pipe'][0].get_width() / 2
-            if pipe_mid <= player_mid < pipe_mid + 4:
-                score += 1
-                SOUNDS['point'].play()
-        
-        # === UPDATE STATE ===
-        if (loop_iter + 1) % 3 == 0:
-            player_index = next(player_index_gen)
-        loop_iter = (loop_iter + 1) % 30
-        base_x = -((-base_x + 100) % base_shift)
-        
-        for uPipe, lPipe in zip(upper_pipes, lower_pipes):
-            uPipe['x'] += pipe_vel_x
-            lPipe['x'] += pipe_vel_x
-        
-        if 0 < upper_pipes[0]['x'] < 5:
-            new_pipe = get_random_pipe()
-            upper_pipes.append(new_pipe[0])
-            lower_pipes.append(new_pipe[1])
-        
-        if upper_pipes[0]['x'] < -IMAGES['pipe'][0].get_width():
-            upper_pipes.pop(0)
-            lower_pipes.pop(0)
+        # === SIMULATION ===
+        flaps.append(flap)
+        _, reward, done = sim.step(flap)
+        if sim.flap_applied:
+            SOUNDS['wing'].play()
+        if done:
+            if planner:
+                planner.close()
+            if RECORD_DIR:
+                replay = Replay(round_seed, THEME, index_order, movement_info['playery'],
+                                movement_info['basex'], game_mode, flaps, sim.score,
+                                sim.crash_info['groundCrash'])
+                try:
+                    replay.save(RECORD_DIR)
+                except OSError:
+                    pass  # recording is best effort, never end the game over it
+            return sim.crash_info
+        if planner:
+            planner.submit(sim.state())
+        if reward:
+            SOUNDS['point'].play()
+        
+        if not RENDER_EVERY or sim.frame % RENDER_EVERY:
+            pacer.wait()
+            continue
+        
+        player_x, player_y = sim.player_x, sim.player_y
+        player_index, player_rot = sim.player_index, sim.player_rot
+        base_x = sim.base_x
+        pipes = sim.pipes
         
         # === RENDERING ===
-        SCREEN.blit(IMAGES['background'], (0, 0))
+        RENDERER.begin(IMAGES['background'])
         
-        for uPipe, lPipe in zip(upper_pipes, lower_pipes):
-            SCREEN.blit(IMAGES['pipe'][0], (uPipe['x'], uPipe['y']))
-            SCREEN.blit(IMAGES['pipe'][1], (lPipe['x'], lPipe['y']))
+        for i in pipes.slots():
+            RENDERER.blit(IMAGES['pipe'][0], (pipes.x[i], pipes.upper_y[i]))
+            RENDERER.blit(IMAGES['pipe'][1], (pipes.x[i], pipes.lower_y[i]))
         
-        SCREEN.blit(IMAGES['base'], (base_x, BASEY))
+        RENDERER.blit(IMAGES['base'], (base_x, BASEY))
         
         # Score (using sprite numbers)
-        draw_score_sprites(SCREEN, score)
+        draw_score_sprites(RENDERER, sim.score)
         
         # Mode indicator (minimal, top-left)
         if game_mode == 'ai':
-            draw_text_outlined(SCREEN, "AI", 24, 20, 15, COLOR_FLAPPY_BLUE, center=False)
+            draw_text_outlined(RENDERER, "AI", 24, 20, 15, COLOR_FLAPPY_BLUE, center=False)
+            # Search size the time budget allowed this frame
+            if AI_TIME_BUDGET:
+                width = mpc.solver.last_width or 'ALL'
+                draw_text_outlined(RENDERER, f"D{mpc.solver.last_depth} W{width}", 18, 10, 38,
+                                   COLOR_FLAPPY_WHITE, center=False)
+            # Frames that had to use the fallback because the plan was late
+            if planner:
+                draw_text_outlined(RENDERER, f"LATE {planner.late}", 18, 10,
+                                   58 if AI_TIME_BUDGET else 38,
+                                   COLOR_FLAPPY_WHITE, center=False)
+            # Share of decisions answered from the memo cache
+            if isinstance(mpc.solver, mpc.MemoSolver):
+                draw_text_outlined(RENDERER, f"MEMO {mpc.solver.hit_rate():.0%}", 18, 10,
+                                   58 if planner else 38,
+                                   COLOR_FLAPPY_WHITE, center=False)
         else:
-            draw_text_outlined(SCREEN, "YOU", 20, 10, 15, COLOR_FLAPPY_YELLOW, center=False)
+            draw_text_outlined(RENDERER, "YOU", 20, 10, 15, COLOR_FLAPPY_YELLOW, center=False)
         
         # Player
-        visible_rot = min(player_rot_thr, player_rot)
-        player_surface = pygame.transform.rotate(IMAGES['player'][player_index], visible_rot)
-        SCREEN.blit(player_surface, (player_x, player_y))
+        visible_rot = min(PLAYER_ROT_THR, player_rot)
+        player_surface = get_rotated(IMAGES['player'][player_index], visible_rot)
+        RENDERER.blit(player_surface, (player_x, player_y))
         
         # AI trajectory (subtle red line)
         if game_mode == 'ai' and traj and len(traj) > 1:
             offset_x = IMAGES['player'][0].get_width() / 2
             offset_y = IMAGES['player'][0].get_height() / 2
             points = [(x + offset_x, y + offset_y) for (x, y) in traj]
-            pygame.draw.lines(SCREEN, (255, 80, 80), False, points, 2)
+            RENDERER.lines((255, 80, 80), False, points, 2)
+        
+        RENDERER.end()
+        pacer.wait()
+
+
+def population_game(movement_info):
+    """
+    AI round of POPULATION birds on one PopulationSim course. Controller c
+    flies bird sprite c (the colors repeat), and a scoreboard on the ground
+    lists each controller's survivors and mean solve time. At normal
+    speed each frame spends at most SOLVE_BUDGET seconds solving, and the
+    birds left follow their last plan; turbo rounds solve every bird, so
+    they don't depend on the wall clock. Ends when every bird has crashed;
+    population rounds are not recorded.
+    """
+    player_index_gen = movement_info['playerIndexGen']
+    index_order = tuple(next(player_index_gen) for _ in range(4))
+    
+    turbo = SIM_SPEED != 1 or RENDER_EVERY != 1
+    population = PopulationSim(CONTROLLERS, POPULATION, seed=random.getrandbits(32),
+                               hitmasks=HITMASKS, solve_budget=None if turbo else SOLVE_BUDGET)
+    population.reset(player_y=movement_info['playery'], base_x=movement_info['basex'],
+                     player_index_gen=cycle(index_order))
+    bird_frames = [SPRITES['player'][c % len(PLAYERS_LIST)] for c in range(len(CONTROLLERS))]
+    
+    # Scoreboard layout: 16px lines on the ground, in as many columns as needed
+    board_rows = int((SCREENHEIGHT - BASEY - 8) // 16)
+    board_width = SCREENWIDTH // -(-len(CONTROLLERS) // board_rows)
+    
+    pacer = FixedTimestep(FPS, SIM_SPEED)
+    
+    while True:
+        # === INPUT ===
+        for event in pygame.event.get():
+            if event.type == QUIT or (event.type == KEYDOWN and event.key == K_ESCAPE):
+                pygame.quit()
+                sys.exit()
         
-        pygame.display.update()
-        FPSCLOCK.tick(FPS)
+        # === AI CONTROL ===
+        flap = population.decide()
+        
+        # === SIMULATION ===
+        reward, _, done = population.step(flap)
+        if done:
+            return population.crash_info
+        if reward:
+            SOUNDS['point'].play()
+        
+        if not RENDER_EVERY or population.frame % RENDER_EVERY:
+            pacer.wait()
+            continue
+        
+        pipes = population.pipes
+        
+        # === RENDERING ===
+        RENDERER.begin(IMAGES['background'])
+        
+        for i in pipes.slots():
+            RENDERER.blit(IMAGES['pipe'][0], (pipes.x[i], pipes.upper_y[i]))
+            RENDERER.blit(IMAGES['pipe'][1], (pipes.x[i], pipes.lower_y[i]))
+        
+        RENDERER.blit(IMAGES['base'], (population.base_x, BASEY))
+        
+        draw_score_sprites(RENDERER, population.score)
+        
+        # Birds, as one batch of cached rotated frames; birds that fly
+        # together are drawn once
+        index = population.player_index
+        birds = dict.fromkeys(
+            (get_rotated(bird_frames[c][index], min(PLAYER_ROT_THR, rot)), (PLAYER_X, y))
+            for c, y, rot in zip(population.group.tolist(), population.y.tolist(),
+                                 population.rot.tolist()))
+        RENDERER.blits(list(birds))
+        
+        # Scoreboard: survivors, mean solve time and settings per controller
+        survivors = population.survivors()
+        for c, controller in enumerate(CONTROLLERS):
+            column, row = divmod(c, board_rows)
+            draw_text_outlined(RENDERER, f"{survivors[c]}/{population.sizes[c]} "
+                                         f"{controller.solve_ms():.2f}MS {controller.label}",
+                               18, 10 + column * board_width, BASEY + 8 + 16 * row,
+                               BIRD_COLORS[c % len(BIRD_COLORS)], center=False,
+                               max_width=board_width - 12)
+        
+        RENDERER.end()
+        pacer.wait()
 
 
 # =============================================================================
@@ -458,8 +598,7 @@ def show_game_over_screen(crash_info, game_mode):
     player_vel_rot = 7
     
     base_x = crash_info['basex']
-    upper_pipes = crash_info['upperPipes']
-    lower_pipes = crash_info['lowerPipes']
+    pipes = crash_info['pipes']
     
     SOUNDS['hit'].play()
     if not crash_info['groundCrash']:
@@ -494,45 +633,48 @@ def show_game_over_screen(crash_info, game_mode):
             show_restart = True
         
         # === RENDERING ===
-        SCREEN.blit(IMAGES['background'], (0, 0))
+        RENDERER.begin(IMAGES['background'])
         
-        for uPipe, lPipe in zip(upper_pipes, lower_pipes):
-            SCREEN.blit(IMAGES['pipe'][0], (uPipe['x'], uPipe['y']))
-            SCREEN.blit(IMAGES['pipe'][1], (lPipe['x'], lPipe['y']))
+        for i in pipes.slots():
+            RENDERER.blit(IMAGES['pipe'][0], (pipes.x[i], pipes.upper_y[i]))
+            RENDERER.blit(IMAGES['pipe'][1], (pipes.x[i], pipes.lower_y[i]))
         
-        SCREEN.blit(IMAGES['base'], (base_x, BASEY))
+        RENDERER.blit(IMAGES['base'], (base_x, BASEY))
         
         # Bird
-        player_surface = pygame.transform.rotate(IMAGES['player'][1], player_rot)
-        SCREEN.blit(player_surface, (player_x, player_y))
+        player_surface = get_rotated(IMAGES['player'][1], player_rot)
+        RENDERER.blit(player_surface, (player_x, player_y))
         
         # Game over sprite
-        SCREEN.blit(IMAGES['gameover'], (50, 180))
+        RENDERER.blit(IMAGES['gameover'], (50, 180))
         
         # Score display
-        draw_text_outlined(SCREEN, "SCORE", 28, SCREENWIDTH // 2, 240, COLOR_FLAPPY_WHITE)
-        draw_text_outlined(SCREEN, str(score), 56, SCREENWIDTH // 2, 280, COLOR_FLAPPY_YELLOW)
+        draw_text_outlined(RENDERER, "SCORE", 28, SCREENWIDTH // 2, 240, COLOR_FLAPPY_WHITE)
+        draw_text_outlined(RENDERER, str(score), 56, SCREENWIDTH // 2, 280, COLOR_FLAPPY_YELLOW)
         
         # Best score
-        draw_text_outlined(SCREEN, f"BEST: {HIGH_SCORE}", 28, SCREENWIDTH // 2, 330, 
+        draw_text_outlined(RENDERER, f"BEST: {HIGH_SCORE}", 28, SCREENWIDTH // 2, 330, 
                           COLOR_FLAPPY_GOLD)
         
         # New high score (blinking)
         if is_new_high and (blink_timer // 12) % 2 == 0:
-            draw_text_outlined(SCREEN, "NEW!", 32, SCREENWIDTH // 2, 365, COLOR_FLAPPY_GREEN)
-        
-        # Mode played
-        if game_mode == 'ai':
-            draw_text_outlined(SCREEN, "AI Mode", 22, SCREENWIDTH // 2, 400, COLOR_FLAPPY_BLUE)
+            draw_text_outlined(RENDERER, "NEW!", 32, SCREENWIDTH // 2, 365, COLOR_FLAPPY_GREEN)
+        
+        # Mode played (population rounds: the last bird's controller)
+        if 'controller' in crash_info:
+            draw_text_outlined(RENDERER, crash_info['controller'], 22, SCREENWIDTH // 2, 400,
+                               COLOR_FLAPPY_BLUE)
+        elif game_mode == 'ai':
+            draw_text_outlined(RENDERER, "AI Mode", 22, SCREENWIDTH // 2, 400, COLOR_FLAPPY_BLUE)
         else:
-            draw_text_outlined(SCREEN, "Manual Mode", 22, SCREENWIDTH // 2, 400, COLOR_FLAPPY_YELLOW)
+            draw_text_outlined(RENDERER, "Manual Mode", 22, SCREENWIDTH // 2, 400, COLOR_FLAPPY_YELLOW)
         
         # Restart prompt (blinking)
         if show_restart and (blink_timer // 20) % 2 == 0:
-            draw_text_outlined(SCREEN, "TAP TO RESTART", 24, SCREENWIDTH // 2, 450, 
+            draw_text_outlined(RENDERER, "TAP TO RESTART", 24, SCREENWIDTH // 2, 450, 
                               COLOR_FLAPPY_WHITE)
         
-        pygame.display.update()
+        RENDERER.end()
         FPSCLOCK.tick(FPS)
 
 
@@ -540,74 +682,18 @@ def show_game_over_screen(crash_info, game_mode):
 # UTILITY FUNCTIONS
 # =============================================================================
 
-def create_crash_info(player_y, ground_crash, base_x, upper_pipes, lower_pipes,
-                      score, player_vel_y, player_rot):
-    return {
-        'y': player_y,
-        'groundCrash': ground_crash,
-        'basex': base_x,
-        'upperPipes': upper_pipes,
-        'lowerPipes': lower_pipes,
-        'score': score,
-        'playerVelY': player_vel_y,
-        'playerRot': player_rot
-    }
-
-
-def get_random_pipe():
-    gap_y = random.randrange(0, int(BASEY * 0.6 - PIPEGAPSIZE))
-    gap_y += int(BASEY * 0.2)
-    pipe_height = IMAGES['pipe'][0].get_height()
-    pipe_x = SCREENWIDTH + 10
-    return [
-        {'x': pipe_x, 'y': gap_y - pipe_height},
-        {'x': pipe_x, 'y': gap_y + PIPEGAPSIZE},
-    ]
-
-
-def check_crash(player, upper_pipes, lower_pipes):
-    pi = player['index']
-    player['w'] = IMAGES['player'][0].get_width()
-    player['h'] = IMAGES['player'][0].get_height()
-    
-    player_rect = pygame.Rect(player['x'], player['y'], player['w'], player['h'])
-    pipe_w = IMAGES['pipe'][0].get_width()
-    pipe_h = IMAGES['pipe'][0].get_height()
-    
-    for uPipe, lPipe in zip(upper_pipes, lower_pipes):
-        u_rect = pygame.Rect(uPipe['x'], uPipe['y'], pipe_w, pipe_h)
-        l_rect = pygame.Rect(lPipe['x'], lPipe['y'], pipe_w, pipe_h)
-        
-        if pixel_collision(player_rect, u_rect, HITMASKS['player'][pi], HITMASKS['pipe'][0]):
-            return [True, False]
-        if pixel_collision(player_rect, l_rect, HITMASKS['player'][pi], HITMASKS['pipe'][1]):
-            return [True, False]
-    
-    return [False, False]
-
-
-def pixel_collision(rect1, rect2, hitmask1, hitmask2):
-    rect = rect1.clip(rect2)
-    if rect.width == 0 or rect.height == 0:
-        return False
-    
-    x1, y1 = rect.x - rect1.x, rect.y - rect1.y
-    x2, y2 = rect.x - rect2.x, rect.y - rect2.y
-    
-    for x in range(rect.width):
-        for y in range(rect.height):
-            if hitmask1[x1 + x][y1 + y] and hitmask2[x2 + x][y2 + y]:
-                return True
-    return False
+@functools.lru_cache(maxsize=ROTATION_CACHE_SIZE)
+def get_rotated(image, angle):
+    """
+    image rotated by angle degrees. The bird only takes a few dozen integer
+    angles, so each (sprite, angle) pair is resampled once
+    """
+    return pygame.transform.rotate(image, angle)
 
 
 def get_hitmask(image):
-    mask = []
-    for x in range(image.get_width()):
-        mask.append([])
-        for y in range(image.get_height()):
-            mask[x].append(bool(image.get_at((x, y))[3]))
-    return mask
+    """Bitmask of the image's non-transparent pixels"""
+    return pygame.mask.from_surface(image, 0)
 
 
 # =============================================================================
@@ -630,42 +716,133 @@ def load_assets():
     SOUNDS['point'] = pygame.mixer.Sound(f'assets/audio/point{sound_ext}')
     SOUNDS['swoosh'] = pygame.mixer.Sound(f'assets/audio/swoosh{sound_ext}')
     SOUNDS['wing'] = pygame.mixer.Sound(f'assets/audio/wing{sound_ext}')
+    
+    load_sprite_variants()
+
+
+def load_sprite_variants():
+    """Decode all background, bird and pipe variants and their hitmasks once"""
+    SPRITES['background'] = tuple(pygame.image.load(path).convert() for path in BACKGROUNDS_LIST)
+    SPRITES['player'] = tuple(
+        tuple(pygame.image.load(path).convert_alpha() for path in paths)
+        for paths in PLAYERS_LIST
+    )
+    pipes = [pygame.image.load(path).convert_alpha() for path in PIPES_LIST]
+    SPRITES['pipe'] = tuple((pygame.transform.flip(pipe, False, True), pipe) for pipe in pipes)
+    
+    # Mask.from_surface builds all of them in under a millisecond
+    for name in ('player', 'pipe'):
+        SPRITE_HITMASKS[name] = tuple(tuple(get_hitmask(image) for image in images)
+                                      for images in SPRITES[name])
 
 
 def load_random_sprites():
-    """Load randomized visual assets"""
+    """Pick a random theme from the preloaded sprite variants"""
+    global THEME
+    if not SPRITES:
+        load_sprite_variants()
+    
     # Background
     bg_idx = random.randint(0, len(BACKGROUNDS_LIST) - 1)
-    IMAGES['background'] = pygame.image.load(BACKGROUNDS_LIST[bg_idx]).convert()
+    IMAGES['background'] = SPRITES['background'][bg_idx]
     
     # Player
     player_idx = random.randint(0, len(PLAYERS_LIST) - 1)
-    IMAGES['player'] = tuple(
-        pygame.image.load(PLAYERS_LIST[player_idx][i]).convert_alpha()
-        for i in range(3)
-    )
+    IMAGES['player'] = SPRITES['player'][player_idx]
+    HITMASKS['player'] = SPRITE_HITMASKS['player'][player_idx]
     
     # Pipes
     pipe_idx = random.randint(0, len(PIPES_LIST) - 1)
-    IMAGES['pipe'] = (
-        pygame.transform.flip(
-            pygame.image.load(PIPES_LIST[pipe_idx]).convert_alpha(), False, True
-        ),
-        pygame.image.load(PIPES_LIST[pipe_idx]).convert_alpha(),
-    )
-    
-    # Hitmasks
-    HITMASKS['pipe'] = (get_hitmask(IMAGES['pipe'][0]), get_hitmask(IMAGES['pipe'][1]))
-    HITMASKS['player'] = tuple(get_hitmask(IMAGES['player'][i]) for i in range(3))
+    IMAGES['pipe'] = SPRITES['pipe'][pipe_idx]
+    HITMASKS['pipe'] = SPRITE_HITMASKS['pipe'][pipe_idx]
+    
+    THEME = (bg_idx, player_idx, pipe_idx)
+
+
+def parse_args(argv=None):
+    """Command line options"""
+    parser = argparse.ArgumentParser(description='Flappy Bird - AI Edition')
+    parser.add_argument('--solver', choices=sorted(mpc.SOLVERS), default='beam',
+                        help='planner that drives the bird in AI mode '
+                             '(mip calls average 29 ms but can take up to 45 ms, '
+                             'longer than a frame)')
+    parser.add_argument('--time-budget', type=float, default=None, metavar='FRACTION',
+                        help='let the AI plan for this fraction of each frame, '
+                             'searching deeper and wider while time remains')
+    parser.add_argument('--memo-size', type=int, default=0, metavar='N',
+                        help='remember the decisions for up to N recent situations, '
+                             'rounded to a few pixels, and reuse them when one repeats '
+                             '(0 = off)')
+    parser.add_argument('--async-solver', action='store_true',
+                        help='plan in a background thread while the frame renders; '
+                             'late plans fall back to a simple rule')
+    parser.add_argument('--population', type=int, default=0, metavar='N',
+                        help='fly N AI birds at once on one course, split across the '
+                             '--controller settings (not recorded)')
+    parser.add_argument('--controller', dest='controllers', action='append', default=[],
+                        type=parse_controller, metavar='SOLVER[:KEY=VALUE,...]',
+                        help="settings flying --population birds, e.g. 'beam:beam_width=8'; "
+                             "repeat to compare several (default: --solver)")
+    parser.add_argument('--speed', type=float, default=1, metavar='N',
+                        help='run the game N times faster than real time (0 = unlimited)')
+    parser.add_argument('--render-every', type=int, default=1, metavar='K',
+                        help='draw only every K-th frame while playing (0 = never)')
+    parser.add_argument('--seed', type=int, default=None,
+                        help='seed for pipes and themes, to repeat a run exactly')
+    parser.add_argument('--record', default=RECORD_DIR, metavar='DIR',
+                        help='directory each round is saved to as a replay (default: %(default)s)')
+    parser.add_argument('--no-record', dest='record', action='store_const', const=None,
+                        help="don't save replays")
+    args = parser.parse_args(argv)
+    turbo = args.speed != 1 or args.render_every != 1
+    if turbo and (args.time_budget or args.async_solver):
+        # Both depend on wall-clock time, which turbo runs must not
+        parser.error('--speed/--render-every need a fixed-size search; '
+                     'drop --time-budget and --async-solver')
+    if turbo and 'mip' in [args.solver] + [c.name for c in args.controllers]:
+        # CBC stops at a time limit, so its plans depend on the machine's load
+        parser.error('--speed/--render-every need a deterministic solver; drop --solver mip')
+    if args.memo_size and args.time_budget:
+        parser.error('--memo-size needs a fixed-size search; drop --time-budget')
+    if args.memo_size and args.solver == 'table':
+        parser.error('--solver table is a lookup already; drop --memo-size')
+    if args.controllers and not args.population:
+        parser.error('--controller needs --population')
+    if args.population and args.population < max(1, len(args.controllers)):
+        parser.error('--population must be at least the number of --controller settings')
+    if args.population and (args.time_budget or args.async_solver or args.memo_size):
+        parser.error('--population plans every bird each frame; '
+                     'drop --time-budget, --async-solver and --memo-size')
+    return args
 
 
 def main():
     """Main entry point"""
-    global SCREEN, FPSCLOCK
+    global SCREEN, RENDERER, FPSCLOCK, AI_TIME_BUDGET, AI_ASYNC, SIM_SPEED, RENDER_EVERY
+    global RECORD_DIR, POPULATION, CONTROLLERS
+    
+    args = parse_args()
+    AI_TIME_BUDGET = args.time_budget
+    AI_ASYNC = args.async_solver
+    SIM_SPEED = args.speed
+    RENDER_EVERY = args.render_every
+    RECORD_DIR = args.record
+    POPULATION = args.population
+    CONTROLLERS = args.controllers or [Controller(args.solver)]
+    if args.seed is not None:
+        random.seed(args.seed)
+    try:
+        mpc.use_solver(args.solver, memo_size=args.memo_size, memo_key=mpc.COARSE_MEMO_KEY)
+        if POPULATION:
+            for controller in CONTROLLERS:
+                controller.make_solver()
+    except (FileNotFoundError, TypeError, ValueError) as e:
+        sys.exit(e)
     
     pygame.init()
     pygame.display.set_caption('Flappy Bird - AI Edition')
     SCREEN = pygame.display.set_mode((SCREENWIDTH, SCREENHEIGHT))
+    RENDERER = DirtyRenderer(SCREEN)
     FPSCLOCK = pygame.time.Clock()
     
     load_assets()
@@ -674,7 +851,10 @@ def main():
         load_random_sprites()
         game_mode = show_title_screen()
         movement_info = show_get_ready_screen(game_mode)
-        crash_info = main_game(movement_info, game_mode)
+        if game_mode == 'ai' and POPULATION:
+            crash_info = population_game(movement_info)
+        else:
+            crash_info = main_game(movement_info, game_mode)
         show_game_over_screen(crash_info, game_mode)
 
 
@@ -1,29 +1,222 @@
 # made by Dark_Pho3nix
-import numpy as np
-import matplotlib.pyplot as plt
+"""
+Model Predictive Control with Mixed Integer Programming.
+Each frame plans the flap sequence over a short horizon as a MIP solved by
+the CBC solver bundled with python-mip, warm-started from the previous
+frame's plan. The model is built once; each call only updates the bounds
+and right-hand sides that depend on the bird and the pipes.
+"""
+
+import time
+
+import mip
 
 PIPEGAPSIZE  = 100 # gap between upper and lower pipe
 PIPEWIDTH = 52
+# the game tests collisions against the unrotated sprite, so the bird's
+# hitbox is BIRDWIDTH x BIRDHEIGHT even while it rotates
 BIRDWIDTH = 34
 BIRDHEIGHT = 24
-BIRDDIAMETER = np.sqrt(BIRDHEIGHT**2 + BIRDWIDTH**2) # the bird rotates in the game, so we use it's maximum extent
 SKY = 0 # location of sky
 GROUND = (512*0.79)-1 # location of ground
 PLAYERX = 57 # location of bird
 
+# Game physics (same as flappy.py / sim.py)
+PIPEVELX = -4 # speed in x
+PLAYERACCY = 1 # players downward accleration
+PLAYERFLAPACC = -14 # players speed on flapping
+MINVELY = -8 # max ascending speed
+MAXVELY = 10 # max descending speed
+
+HORIZON = 20 # frames planned ahead
+# Seconds one solve() call may take, model updates included. CBC can still
+# overshoot it (p99 ~33 ms, max ~45 ms); 25-28 ms limits crash the bundled CBC
+TIME_LIMIT = 0.03
+CBC_OVERRUN = 0.008 # CBC runs this much past max_seconds while it winds down
+MIN_SOLVE_TIME = 0.002 # below this CBC is skipped and the warm start is used
+BIGM = 40 # bounds |velocity before clipping - clipped velocity|
 
-def getPipeConstraints(x, y, lowerPipes):
-    constraints = [] # init pipe constraint list
-    for pipe in lowerPipes:
-        dist_from_front = pipe['x'] - x - BIRDDIAMETER
-        dist_from_back = pipe['x'] - x + PIPEWIDTH
+
+# lowerPipes below is a list of (x, y) pairs, y being the top of the lower
+# pipe, as sim.PipeRing.pairs() returns them
+
+def getPipeBounds(x, lowerPipes):
+    lb, ub = SKY, GROUND - BIRDHEIGHT # init with sky and ground
+    for pipe_x, pipe_y in lowerPipes:
+        dist_from_front = pipe_x - x - BIRDWIDTH
+        dist_from_back = pipe_x - x + PIPEWIDTH
         if (dist_from_front < 0) and (dist_from_back > 0):
-            constraints += [y <= (pipe['y'] - BIRDDIAMETER)] # y above lower pipe
-            constraints += [y >= (pipe['y'] - PIPEGAPSIZE)] # y below upper pipe
-    return constraints
+            ub = min(ub, pipe_y - BIRDHEIGHT) # y above lower pipe
+            lb = max(lb, pipe_y - PIPEGAPSIZE) # y below upper pipe
+    return lb, ub
+
+def getGapTarget(x, lowerPipes):
+    for pipe_x, pipe_y in lowerPipes:
+        if pipe_x - x + PIPEWIDTH > 0: # first pipe not yet passed
+            return pipe_y - (PIPEGAPSIZE / 2) - (BIRDHEIGHT / 2)
+    return GROUND / 2
+
+def simulate(playery, playerVelY, flaps, lowerPipes, horizon=HORIZON):
+    """
+    Flap sequence extended to horizon frames by flapping whenever the bird
+    falls below the gap target, with the heights, velocities and clip flags
+    it produces
+    """
+    flaps = list(flaps)
+    ys, vels, los, his = [], [], [], []
+    y, vel = playery, playerVelY
+    for t in range(horizon):
+        if t == len(flaps):
+            target = getGapTarget(PLAYERX - t * PIPEVELX, lowerPipes)
+            flaps.append(y > target and vel >= 0)
+        flap = flaps[t]
+        vel = vel + (PLAYERFLAPACC if flap else PLAYERACCY)
+        los.append(vel < MINVELY)
+        his.append(vel > MAXVELY)
+        vel = max(MINVELY, min(MAXVELY, vel))
+        y = y + vel
+        ys.append(y)
+        vels.append(vel)
+    return flaps, ys, vels, los, his
+
+
+class MIPSolver:
+    """
+    One MIP over the next horizon frames:
+    binaries flap[t] choose the action, binaries lo[t]/hi[t] select whether
+    the velocity is clipped at MINVELY/MAXVELY, and y/vel follow the game's
+    update exactly. Pipe, ground and sky limits are bounds on y[t]; the
+    objective keeps the bird near the next gap center at low speed.
+
+    time_limit bounds the whole solve() call: updating the model and CBC's
+    overrun past max_seconds come out of it. CBC rarely proves optimality
+    in that time, so the plan is usually the best one found so far (status
+    FEASIBLE), and a slow machine can still overshoot by a few milliseconds.
+    """
+
+    def __init__(self, horizon=HORIZON, time_limit=TIME_LIMIT, incremental=True):
+        self.horizon = horizon
+        self.time_limit = time_limit
+        # Receding horizon: warm-start each frame from the previous frame's plan
+        self.incremental = incremental
+        self.plan = [] # flap sequence found last frame
+        self.last_path = []
+        self.last_depth = 0
+        self.last_width = None
+        self.last_status = None
+        self.build()
+
+    def build(self):
+        """Builds the model with the bird at rest and no pipes"""
+        N = self.horizon
+        m = self.model = mip.Model(sense=mip.MINIMIZE, solver_name=mip.CBC)
+        m.verbose = 0
+        m.threads = 1
+        m.preprocess = 0 # CBC's presolve adds nothing on models this small
+
+        flap = self.flap = [m.add_var(var_type=mip.BINARY) for t in range(N)]
+        lo = self.lo = [m.add_var(var_type=mip.BINARY) for t in range(N)]
+        hi = self.hi = [m.add_var(var_type=mip.BINARY) for t in range(N)]
+        y = self.y = [m.add_var(lb=SKY, ub=GROUND - BIRDHEIGHT) for t in range(N)]
+        vel = self.vel = [m.add_var(lb=MINVELY, ub=MAXVELY) for t in range(N)]
+        dist = self.dist = [m.add_var() for t in range(N)] # |y - gap target|
+        speed = self.speed = [m.add_var() for t in range(N)] # |vel|
+
+        # Constraints whose right-hand side solve() rewrites every frame:
+        # the bird's state enters through frame 0, the gap target through
+        # the dist rows
+        self.above_target, self.below_target = [], []
+        for t in range(N):
+            # vel[t] = clip(prev_vel + acc, MINVELY, MAXVELY)
+            # where acc is PLAYERFLAPACC when flapping, PLAYERACCY otherwise
+            # (at t == 0, prev_vel + PLAYERACCY is a constant kept in the
+            # right-hand side)
+            unclipped = (PLAYERFLAPACC - PLAYERACCY) * flap[t]
+            if t > 0:
+                unclipped += vel[t - 1] + PLAYERACCY
+            rows = [m.add_constr(vel[t] - unclipped - BIGM * lo[t] <= 0),
+                    m.add_constr(vel[t] - unclipped + BIGM * hi[t] >= 0)]
+            if t == 0:
+                self.first_vel = rows
+            m += vel[t] <= MINVELY + BIGM * (1 - lo[t])
+            m += vel[t] >= MAXVELY - BIGM * (1 - hi[t])
+            m += lo[t] + hi[t] <= 1
+            if t == 0:
+                self.first_y = m.add_constr(y[t] - vel[t] == 0)
+            else:
+                m += y[t] == y[t - 1] + vel[t]
+
+            self.above_target.append(m.add_constr(dist[t] - y[t] >= 0))
+            self.below_target.append(m.add_constr(dist[t] + y[t] >= 0))
+            m += speed[t] >= vel[t]
+            m += speed[t] >= -vel[t]
+
+        m.objective = mip.minimize(mip.xsum(dist) + 0.5 * mip.xsum(speed))
+
+    def solve(self, playery, playerVelY, pipes, deadline=None):
+        entry = time.perf_counter()
+        time_limit = self.time_limit
+        if deadline is not None:
+            time_limit = min(time_limit, deadline - entry)
+
+        N = self.horizon
+        lowerPipes = pipes.pairs()
+        y = self.y
+
+        for constr in self.first_vel:
+            constr.rhs = playerVelY + PLAYERACCY
+        self.first_y.rhs = playery
+        targets = []
+        for t in range(N):
+            # The game checks collisions before moving the pipes, so frame
+            # t+1 meets pipes shifted by t * PIPEVELX, i.e. a bird t * 4
+            # pixels further along the course.
+            x = PLAYERX - t * PIPEVELX
+            y[t].lb, y[t].ub = getPipeBounds(x, lowerPipes)
+            target = getGapTarget(x, lowerPipes)
+            self.above_target[t].rhs = -target
+            self.below_target[t].rhs = target
+            targets.append(target)
+
+        # Warm start: last frame's plan shifted by one frame, then the
+        # gap-tracking heuristic for the newly exposed last frame
+        shifted = self.plan[1:N] if self.incremental else []
+        start, start_ys, start_vels, start_los, start_his = \
+            simulate(playery, playerVelY, shifted, lowerPipes, N)
+
+        status = None
+        time_limit -= time.perf_counter() - entry + CBC_OVERRUN
+        if time_limit >= MIN_SOLVE_TIME:
+            self.model.start = \
+                [(self.flap[t], float(start[t])) for t in range(N)] + \
+                [(self.lo[t], float(start_los[t])) for t in range(N)] + \
+                [(self.hi[t], float(start_his[t])) for t in range(N)] + \
+                [(y[t], float(start_ys[t])) for t in range(N)] + \
+                [(self.vel[t], float(start_vels[t])) for t in range(N)] + \
+                [(self.dist[t], abs(start_ys[t] - targets[t])) for t in range(N)] + \
+                [(self.speed[t], float(abs(start_vels[t]))) for t in range(N)]
+            status = self.model.optimize(max_seconds=time_limit)
+        self.last_status = status
+
+        if status in (mip.OptimizationStatus.OPTIMAL, mip.OptimizationStatus.FEASIBLE):
+            self.plan = [f.x > 0.5 for f in self.flap]
+            self.last_path = [(PLAYERX, y[t].x) for t in range(N)]
+            self.last_depth = N
+        else:
+            # No plan this frame: follow the warm start instead
+            self.plan = start
+            self.last_path = []
+            self.last_depth = 0
+
+        return self.plan[0], self.last_path
+
 
-def solve(playery, playerVelY, lowerPipes):
+# Global Singleton, built on first use: importing gd (as mpc.load_mip_solver
+# does) shouldn't build a CBC model nobody solves
+solver = None
 
-    pipeVelX = -4 # speed in x
-    playerAccY    =   1   # players downward accleration
-    playerFlapAcc =  -20   # players speed on flapping
+def solve(playery, playerVelY, pipes, deadline=None):
+    global solver
+    if solver is None:
+        solver = MIPSolver()
+    return solver.solve(playery, playerVelY, pipes, deadline)
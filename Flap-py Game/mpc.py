@@ -0,0 +1,624 @@
+# made by Dark_Pho3nix
+from collections import OrderedDict
+import copy
+import math
+import time
+
+import numpy as np
+from numpy.lib.stride_tricks import as_strided
+
+from sim import next_gap_reach, pipe_reach, pipes_ahead
+
+# =============================================================================
+# GAME CONSTANTS
+# =============================================================================
+PIPEGAPSIZE = 100
+PIPEWIDTH = 52
+BIRDWIDTH = 34
+BIRDHEIGHT = 24
+# Safety margin: Act as if bird is slightly bigger to avoid grazing pipes
+SAFETY_MARGIN = 2 
+COLLISION_W = BIRDWIDTH + (SAFETY_MARGIN * 2)
+COLLISION_H = BIRDHEIGHT + (SAFETY_MARGIN * 2)
+
+SCREENWIDTH = 288
+BASEY = 512 * 0.79
+PIPE_VEL_X = -4
+PLAYER_ACC_Y = 1
+PLAYER_FLAP_ACC = -14
+MAX_VEL_Y = 10
+MIN_VEL_Y = -8
+PLAYER_X = 57
+
+# Search defaults
+BEAM_WIDTH = 10   # Keep top 10 best paths
+LOOKAHEAD = 25    # Look 25 frames ahead (approx 1 sec)
+VEL_PENALTY = 0.5 # Score lost per unit of |velocity| per step
+
+# Anytime search (solve() with a deadline): a MIN_LOOKAHEAD pass that always
+# finishes, then the default search, then each extra pass looks DEEPEN_STEP
+# frames further and keeps twice as many paths, up to these caps
+MIN_LOOKAHEAD = 5
+DEEPEN_STEP = 10
+MAX_LOOKAHEAD = 120
+MAX_BEAM_WIDTH = 1280
+
+# Entries kept by MemoSolver (about 100 bytes each plus the trajectory)
+MEMO_SIZE = 100000
+# Lossy memo key for long sessions (flappy.py --memo-size): heights in 4 px,
+# pipe offsets in 8 px (two frames), gaps in 32 px. In front of dp over 30
+# seeded games it answered 55% of frames from the cache (69% over the last
+# 10) and every game still reached the frame cap.
+COARSE_MEMO_KEY = {'y_quantum': 4, 'x_quantum': 8, 'gap_quantum': 32, 'next_gap_quantum': 32}
+
+class BeamSearchSolver:
+    def __init__(self, beam_width=BEAM_WIDTH, lookahead=LOOKAHEAD, incremental=True,
+                 vel_penalty=VEL_PENALTY, safety_margin=SAFETY_MARGIN):
+        self.beam_width = beam_width
+        self.lookahead = lookahead
+        self.vel_penalty = vel_penalty
+        self.safety_margin = safety_margin
+        # Receding horizon: start each frame from the previous frame's tree
+        self.incremental = incremental
+        self.tree = None
+        self.tree_pipes = []
+        self.last_path = []
+        # Size of the largest search the last solve() call finished
+        self.last_depth = 0
+        self.last_width = 0
+
+    def get_corridors(self, x_offsets, pipes):
+        """
+        Precomputes, for the pipes (a sim.PipeRing) moved by each of
+        'x_offsets', the interval [y_min, y_max] of heights that don't
+        collide and the target height of the nearest relevant gap. Returns
+        three arrays (y_min, y_max, target_y) aligned with 'x_offsets'.
+        """
+        x_offsets = np.asarray(x_offsets)
+        
+        # 1. Ground/Sky
+        # Treat ceiling as death to prevent flying over pipes cheat/bug.
+        # The ground test is strict: y + collision_h < BASEY - 1
+        y_min = np.zeros(len(x_offsets))
+        margin = self.safety_margin
+        collision_h = BIRDHEIGHT + margin * 2
+        y_max = np.full(len(x_offsets), np.nextafter(BASEY - 1 - collision_h, -np.inf))
+        target_y = np.full(len(x_offsets), BASEY / 2) # Default to middle of screen
+        targeted = np.zeros(len(x_offsets), dtype=bool)
+
+        # 2. Pipes
+        # Bird static X = PLAYER_X.
+        # Pipe effective X = pipe x + x_offset.
+        bird_left = PLAYER_X - margin
+        bird_right = PLAYER_X + BIRDWIDTH + margin
+
+        for pipe_x, pipe_y in pipes.pairs():
+            px = pipe_x + x_offsets
+            
+            # Gap Y range
+            # pipe_y is the TOP of the LOWER pipe.
+            # Gap is [pipe_y - PIPEGAPSIZE, pipe_y]
+            # While the pipe overlaps the bird horizontally:
+            # Bird Top must stay below Upper Pipe Bottom,
+            # Bird Bottom must stay above Lower Pipe Top.
+            overlap = (px + PIPEWIDTH >= bird_left) & (px <= bird_right)
+            y_min[overlap] = np.maximum(y_min[overlap], pipe_y - PIPEGAPSIZE + margin)
+            y_max[overlap] = np.minimum(y_max[overlap], pipe_y - BIRDHEIGHT - margin)
+            
+            # Target the first pipe that ends AFTER the bird
+            upcoming = ~targeted & (px + PIPEWIDTH > PLAYER_X)
+            target_y[upcoming] = pipe_y - (PIPEGAPSIZE / 2) - (BIRDHEIGHT / 2)
+            targeted |= upcoming
+        
+        return y_min, y_max, target_y
+
+    def check_collision(self, y, x_offset, pipes):
+        """
+        Checks collision for birds at (PLAYER_X, y) 
+        given that pipes have moved by 'x_offset' from their original positions.
+        'y' may be a scalar or a NumPy array of candidate heights.
+        """
+        y_min, y_max, _ = self.get_corridors([x_offset], pipes)
+        return (y < y_min[0]) | (y > y_max[0])
+
+    def get_gap_center(self, x_offset, pipes):
+        """Finds the Y center of the nearest relevant gap."""
+        _, _, target_y = self.get_corridors([x_offset], pipes)
+        return target_y[0]
+
+    def deduplicate(self, candidates, dy, vel, score):
+        """
+        Transposition table for one timestep: states with identical (y, vel)
+        have identical futures, so only the best-scoring one is kept.
+        Every height in a layer is playery plus an integer, so
+        (dy, vel) packs losslessly into a single int64 key.
+        """
+        keys = (np.rint(dy[candidates]).astype(np.int64) << 5) | (vel[candidates] - MIN_VEL_Y)
+        order = np.lexsort((-score[candidates], keys))
+        sorted_keys = keys[order]
+        first = np.empty(len(order), dtype=bool)
+        first[0] = True
+        np.not_equal(sorted_keys[1:], sorted_keys[:-1], out=first[1:])
+        return candidates[order[first]]
+
+    def reconstruct_path(self, layers, index):
+        """Walks parent pointers back from 'index' in the last layer."""
+        path = [None] * len(layers)
+        for t in range(len(layers) - 1, -1, -1):
+            path[t] = (PLAYER_X, float(layers[t]['y'][index]))
+            index = layers[t]['parent'][index]
+        return path
+
+    def expand(self, t, ys, vels, scores, first_actions, corridors, playery, beam_width):
+        """
+        Expands every state of the layer after t steps with both actions and
+        returns the pruned layer after t+1 steps, or None if nothing survives.
+        At t == 0 the arrays hold the root alone and first_actions is None.
+        'corridors' is get_corridors() over the lookahead window.
+        """
+        y_min, y_max, targets = corridors
+        target_y = targets[t]
+        
+        # Expand every state both ways at once: [flap..., glide...]
+        # If flap: vel += flap_acc (-14), no gravity that frame.
+        # If glide: vel += acc (+1).
+        vel_next = np.concatenate((vels + PLAYER_FLAP_ACC, vels + PLAYER_ACC_Y))
+        np.clip(vel_next, MIN_VEL_Y, MAX_VEL_Y, out=vel_next)
+        y_next = np.concatenate((ys, ys)) + vel_next
+        parents = np.concatenate((np.arange(len(ys)), np.arange(len(ys))))
+        flaps = np.repeat([True, False], len(ys))
+        
+        if first_actions is None:
+            actions = flaps
+        else:
+            actions = first_actions[parents]
+        
+        # Heuristic Score
+        # 1. Distance to target (minimize)
+        # 2. Penalty for high velocity (stability)
+        score_next = scores[parents] - np.abs(y_next - target_y) - np.abs(vel_next) * self.vel_penalty
+        
+        alive = (y_next >= y_min[t]) & (y_next <= y_max[t])
+        if not alive.any():
+            return None
+        
+        survivors = self.deduplicate(np.flatnonzero(alive), y_next - playery,
+                                     vel_next, score_next)
+        
+        # Pruning: Keep only top beam_width survivors (partial selection)
+        if len(survivors) > beam_width:
+            top = np.argpartition(-score_next[survivors], beam_width - 1)
+            survivors = survivors[top[:beam_width]]
+        
+        return {
+            'y': y_next[survivors],
+            'vel': vel_next[survivors],
+            'score': score_next[survivors],
+            'parent': parents[survivors],
+            'flap': flaps[survivors],
+            'first': actions[survivors],
+            'target': target_y,
+        }
+
+    def match_pipes(self, pipes):
+        """
+        Compares 'pipes' with the previous solve()'s pipes moved one
+        frame. Returns how many pipes were appended since, or None if they
+        are not the same course (new round, skipped frames, ...).
+        Pipes retired from the front are behind the bird and don't matter.
+        """
+        expected = [(x + PIPE_VEL_X, y) for x, y in self.tree_pipes]
+        current = pipes.pairs()
+        while expected and (not current or expected[0] != current[0]):
+            if expected[0][0] + PIPEWIDTH >= PLAYER_X - self.safety_margin:
+                return None
+            expected.pop(0)
+        if current[:len(expected)] != expected:
+            return None
+        return len(current) - len(expected)
+
+    def reuse_tree(self, playery, playerVelY, pipes, corridors):
+        """
+        Re-roots the previous frame's tree at the state the bird actually
+        reached, keeping that state's descendants one step closer to the
+        root. Returns those layers (one short of the horizon), or None when
+        the tree can't be reused and the search must start over.
+        """
+        old = self.tree
+        if old is None or len(old) != len(corridors[0]) or len(old) < 2:
+            return None
+        
+        # The new root must be one of the previous root's children
+        matches = np.flatnonzero((old[0]['y'] == playery) & (old[0]['vel'] == playerVelY))
+        if not len(matches):
+            return None
+        appended = self.match_pipes(pipes)
+        if appended is None:
+            return None
+        
+        layers = []
+        for t, layer in enumerate(old[1:]):
+            if t == 0:
+                keep = layer['parent'] == matches[0]
+            else:
+                keep = prev_keep[layer['parent']]
+            
+            # Re-validate against new pipes: they can block states, and
+            # a changed target makes the stored scores stale.
+            if appended:
+                y_min, y_max, targets = corridors
+                if targets[t] != layer['target']:
+                    return None
+                keep &= (layer['y'] >= y_min[t]) & (layer['y'] <= y_max[t])
+            if not keep.any():
+                return None
+            
+            flaps = layer['flap'][keep]
+            if t == 0:
+                parents = np.zeros(len(flaps), dtype=np.int64)
+                first_actions = flaps
+            else:
+                parents = prev_index[layer['parent'][keep]]
+                first_actions = layers[-1]['first'][parents]
+            layers.append({
+                'y': layer['y'][keep],
+                'vel': layer['vel'][keep],
+                'score': layer['score'][keep],
+                'parent': parents,
+                'flap': flaps,
+                'first': first_actions,
+                'target': layer['target'],
+            })
+            prev_keep = keep
+            prev_index = np.cumsum(keep) - 1
+        
+        return layers
+
+    def search(self, playery, playerVelY, pipes, lookahead, beam_width,
+               incremental=False, deadline=None):
+        """
+        One beam search pass. Returns (flap, trajectory), or None if
+        'deadline' passed before it finished. With 'incremental' the pass
+        starts from, and then replaces, the tree kept from the last frame.
+        """
+        # The whole beam lives in arrays: one entry per surviving state.
+        # The search tree is one dict of arrays per lookahead step, with
+        # parent indices into the previous step; only the winning path is
+        # rebuilt at the end. Score: Higher is better.
+        
+        # Collision corridor and gap target of every lookahead step
+        corridors = self.get_corridors(np.arange(lookahead) * PIPE_VEL_X, pipes)
+        
+        layers = None
+        if incremental:
+            layers = self.reuse_tree(playery, playerVelY, pipes, corridors)
+        reused = layers is not None
+        if not reused:
+            layers = []
+        
+        while len(layers) < lookahead:
+            if deadline is not None and time.perf_counter() > deadline:
+                if incremental:
+                    self.tree = None
+                return None
+            if layers:
+                prev = layers[-1]
+                layer = self.expand(len(layers), prev['y'], prev['vel'], prev['score'],
+                                    prev['first'], corridors, playery, beam_width)
+            else:
+                # We need to preserve the decision of the FIRST step (Frame 0)
+                # to return it at the end.
+                layer = self.expand(0, np.array([playery], dtype=np.float64),
+                                    np.array([playerVelY], dtype=np.int64),
+                                    np.zeros(1), None, corridors, playery, beam_width)
+            
+            if layer is None:
+                if reused:
+                    # The reused tree covers only part of the search space,
+                    # so retry from scratch before giving up.
+                    layers, reused = [], False
+                    continue
+                # No survivors! We are doomed. 
+                # Usually best to Flap if dying low, Glide if dying high.
+                if incremental:
+                    self.tree = None
+                return True, []
+            layers.append(layer)
+
+        if incremental:
+            self.tree = layers
+            self.tree_pipes = pipes.pairs()
+        
+        # End of Search
+        # Pick the absolute best survivor
+        best = np.argmax(layers[-1]['score'])
+        should_flap = bool(layers[-1]['first'][best])
+        return should_flap, self.reconstruct_path(layers, best)
+
+    def solve(self, playery, playerVelY, pipes, deadline=None):
+        """
+        Returns (flap, trajectory) for the bird at (playery, playerVelY).
+        With a 'deadline' (a time.perf_counter() timestamp) only a short
+        MIN_LOOKAHEAD pass runs unchecked, so there is always a decision;
+        the default search and the deeper, wider passes after it stop once
+        the deadline passes, and the decision of the largest pass that
+        finished in time is kept. last_depth and last_width report that pass.
+        """
+        depth, width = self.lookahead, self.beam_width
+        if deadline is not None:
+            depth = min(depth, MIN_LOOKAHEAD)
+        result = self.search(playery, playerVelY, pipes, depth, width,
+                             incremental=self.incremental and depth == self.lookahead)
+        self.last_depth, self.last_width = depth, width
+        
+        # A doomed result stays doomed further out, so stop deepening there
+        while deadline is not None and result[1]:
+            if depth < self.lookahead:
+                grown = (self.lookahead, width)
+            else:
+                grown = (min(depth + DEEPEN_STEP, MAX_LOOKAHEAD),
+                         None if width is None else min(width * 2, MAX_BEAM_WIDTH))
+            if grown == (depth, width):
+                break
+            depth, width = grown
+            # The default search keeps growing the tree reused across frames
+            default = (depth, width) == (self.lookahead, self.beam_width)
+            deeper = self.search(playery, playerVelY, pipes, depth, width,
+                                 incremental=self.incremental and default,
+                                 deadline=deadline)
+            # Out of time, or no survivor over the longer horizon: keep
+            # the last plan that does survive.
+            if deeper is None or not deeper[1]:
+                break
+            result = deeper
+            self.last_depth, self.last_width = depth, width
+        
+        self.last_path = result[1]
+        return result
+
+class DynamicProgrammingSolver(BeamSearchSolver):
+    """
+    Exact counterpart of BeamSearchSolver: same dynamics, collision model
+    and heuristic score, but instead of pruning it sweeps every (y, vel)
+    cell of the lattice for every lookahead step by backward induction.
+    """
+
+    # Velocity never leaves [MIN_VEL_Y, MAX_VEL_Y] after a step, so a
+    # padding of that size keeps every successor index inside the table.
+    PAD_TOP = -MIN_VEL_Y
+    PAD_BOTTOM = MAX_VEL_Y
+
+    def __init__(self, lookahead=LOOKAHEAD, vel_penalty=VEL_PENALTY, safety_margin=SAFETY_MARGIN):
+        super().__init__(beam_width=None, lookahead=lookahead, incremental=False,
+                         vel_penalty=vel_penalty, safety_margin=safety_margin)
+        self.n_rows = int(BASEY) + 1
+        self.vels = np.arange(MIN_VEL_Y, MAX_VEL_Y + 1)
+        n_cols = len(self.vels)
+        # Successor column of every velocity column, per action
+        self.next_cols = [np.clip(self.vels + acc, MIN_VEL_Y, MAX_VEL_Y) - MIN_VEL_Y
+                          for acc in (PLAYER_FLAP_ACC, PLAYER_ACC_Y)]
+        self.padded = np.full((self.n_rows + self.PAD_TOP + self.PAD_BOTTOM, n_cols), -np.inf)
+        # A bird moving into column c also moves c + MIN_VEL_Y rows, i.e. c
+        # rows down the padded table. So every successor of grid row r
+        # sits on the diagonal view successors[r, c] = padded[r + c, c].
+        row_stride, col_stride = self.padded.strides
+        self.successors = as_strided(self.padded, shape=(self.n_rows, n_cols),
+                                     strides=(row_stride, row_stride + col_stride))
+        self.vel_cost = np.abs(self.vels)[None, :] * vel_penalty
+
+    def sweep(self, pipes, lookahead, base=0.0, root_row=None, deadline=None):
+        """
+        Backward induction over the lattice of heights base + integer.
+        Returns (value, offsets), or None if 'deadline' passed first:
+        value[t][row - offsets[t], col] is the best total score from step
+        t+1 to the horizon for a bird in that cell after t+1 steps, -inf if
+        doomed. Only rows inside the collision-free corridor are swept, and
+        with a root_row only those reachable from it within t+1 steps.
+        Afterwards self.successors holds the step-0 values (see policy()).
+        """
+        heights = base + np.arange(self.n_rows)
+        value = [None] * lookahead
+        offsets = [0] * lookahead
+        y_mins, y_maxs, targets = self.get_corridors(np.arange(lookahead) * PIPE_VEL_X,
+                                                     pipes)
+        padded = self.padded
+        flap_cols, glide_cols = self.next_cols
+        for t in range(lookahead - 1, -1, -1):
+            if deadline is not None and time.perf_counter() > deadline:
+                return None
+            lo = max(0, math.ceil(y_mins[t] - base))
+            hi = min(self.n_rows, math.floor(y_maxs[t] - base) + 1)
+            if root_row is not None:
+                lo = max(lo, root_row + (t + 1) * MIN_VEL_Y)
+                hi = min(hi, root_row + (t + 1) * MAX_VEL_Y + 2)
+            hi = max(lo, hi)
+            
+            if t < lookahead - 1:
+                successors = self.successors[lo:hi]
+                score = np.maximum(successors[:, flap_cols], successors[:, glide_cols])
+            else:
+                score = np.zeros((hi - lo, len(self.vels)))
+            score -= np.abs(heights[lo:hi] - targets[t])[:, None]
+            score -= self.vel_cost
+            value[t] = score
+            offsets[t] = lo
+            
+            padded.fill(-np.inf)
+            padded[self.PAD_TOP + lo:self.PAD_TOP + hi] = score
+        return value, offsets
+
+    def policy(self, pipes, lookahead=None):
+        """
+        The decision search() would take from every integer height and
+        velocity at once: a (rows, velocities) boolean array, True = flap,
+        indexed by [int(y), vel - MIN_VEL_Y].
+        """
+        self.sweep(pipes, lookahead or self.lookahead)
+        flap_cols, glide_cols = self.next_cols
+        # Doomed either way (-inf on both sides) flaps, like search()
+        return self.successors[:, flap_cols] >= self.successors[:, glide_cols]
+
+    def search(self, playery, playerVelY, pipes, lookahead, beam_width=None,
+               incremental=False, deadline=None):
+        """
+        One exhaustive pass over 'lookahead' steps. Returns (flap,
+        trajectory), or None if 'deadline' passed before it finished.
+        There is no beam, so 'beam_width' and 'incremental' are ignored.
+        """
+        # Grid rows are playery's fractional part plus an integer, which is
+        # every height reachable from playery.
+        base = playery - np.floor(playery)
+        swept = self.sweep(pipes, lookahead, base, math.floor(playery), deadline)
+        if swept is None:
+            return None
+        value, offsets = swept
+
+        # Walk forward from the root, always taking the better branch
+        path = []
+        y, vel = playery, playerVelY
+        should_flap = None
+        for t in range(lookahead):
+            best = None
+            for flap, acc in ((True, PLAYER_FLAP_ACC), (False, PLAYER_ACC_Y)):
+                v = max(MIN_VEL_Y, min(MAX_VEL_Y, vel + acc))
+                row = int(round(y + v - base)) - offsets[t]
+                if not 0 <= row < len(value[t]):
+                    continue
+                cell = value[t][row, v - MIN_VEL_Y]
+                if cell > -np.inf and (best is None or cell > best[0]):
+                    best = (cell, flap, y + v, v)
+            if best is None:
+                # No survivors! Same fallback as the beam search.
+                return True, []
+            _, flap, y, vel = best
+            if should_flap is None:
+                should_flap = flap
+            path.append((PLAYER_X, float(y)))
+
+        return should_flap, path
+
+class MemoSolver:
+    """
+    Memo cache in front of another solver, keyed on the relative state:
+    the bird's height above the next gap, its velocity, the height of that
+    gap, the offset of each pipe within the solver's lookahead (farther
+    pipes can't collide with it), and the height of the gap after the next
+    one relative to it, while the search can pass the next pipe and aim
+    for it. A repeated key returns the stored decision, with the
+    trajectory moved to the current height, instead of searching again.
+
+    With the default quanta of 1 the key is lossless: only states the
+    solver can't tell apart share an entry, so a deterministic solver
+    (dp, table) decides exactly as without the cache. Quanta above 1, or
+    gap_quantum=None (which leaves the gap's absolute height, i.e. the
+    distance to ground and ceiling, out), are lossy: they merge states that
+    may need different actions, trading decisions for hits. Exact repeats
+    are rare; COARSE_MEMO_KEY is a lossy key that still survives. The beam
+    search reuses its previous tree, so its decisions depend on history
+    and a hit may differ from what it would have searched.
+
+    The cache holds at most max_size entries and evicts the least recently
+    used one ('lru') or the oldest one ('fifo'). Calls with a deadline
+    depend on the clock, so they bypass it. hits and misses count lookups;
+    other attributes (last_depth, ...) are read from the wrapped solver.
+    """
+
+    def __init__(self, solver, max_size=MEMO_SIZE, eviction='lru', y_quantum=1,
+                 x_quantum=1, gap_quantum=1, next_gap_quantum=1):
+        if eviction not in ('lru', 'fifo'):
+            raise ValueError("eviction must be 'lru' or 'fifo'")
+        self.solver = solver
+        self.max_size = max_size
+        self.eviction = eviction
+        self.y_quantum = y_quantum
+        self.x_quantum = x_quantum
+        self.gap_quantum = gap_quantum
+        self.next_gap_quantum = next_gap_quantum
+        self.margin = getattr(solver, 'safety_margin', SAFETY_MARGIN)
+        lookahead = getattr(solver, 'lookahead', None) or getattr(solver, 'horizon', LOOKAHEAD)
+        self.reach = pipe_reach(lookahead, self.margin)
+        self.next_gap_reach = next_gap_reach(lookahead)
+        self.cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __getattr__(self, name):
+        return getattr(self.solver, name)
+
+    def key(self, playery, playerVelY, pipes):
+        """Canonical, quantized state tuple"""
+        ahead = pipes_ahead(pipes, self.margin)
+        if not ahead:
+            return (round(playery / self.y_quantum), playerVelY)
+        x, gap_y = ahead[0]
+        key = (round((playery - gap_y) / self.y_quantum), playerVelY,
+               None if self.gap_quantum is None else round(gap_y / self.gap_quantum))
+        if x <= self.next_gap_reach and len(ahead) > 1:
+            key += (round((ahead[1][1] - gap_y) / self.next_gap_quantum),)
+        # Only pipes in reach can collide, and their gaps are in the key already
+        return key + tuple(int(x // self.x_quantum) for x, _ in ahead if x <= self.reach)
+
+    def solve(self, playery, playerVelY, pipes, deadline=None):
+        if deadline is not None or not self.max_size:
+            return self.solver.solve(playery, playerVelY, pipes, deadline)
+        key = self.key(playery, playerVelY, pipes)
+        entry = self.cache.get(key)
+        if entry is not None:
+            self.hits += 1
+            if self.eviction == 'lru':
+                self.cache.move_to_end(key)
+            flap, path = entry
+            return flap, [(x, playery + dy) for x, dy in path]
+
+        self.misses += 1
+        flap, path = self.solver.solve(playery, playerVelY, pipes)
+        self.cache[key] = (flap, [(x, y - playery) for x, y in path])
+        if len(self.cache) > self.max_size:
+            self.cache.popitem(last=False)
+        return flap, path
+
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'hit_rate': self.hit_rate(),
+                'size': len(self.cache), 'max_size': self.max_size}
+
+# Available backends, selectable with use_solver()
+def load_mip_solver(**kwargs):
+    """MIP backend from gd.py, imported on demand since it needs python-mip"""
+    from gd import MIPSolver
+    return MIPSolver(**kwargs)
+
+
+def load_policy_table(**kwargs):
+    """Compiled policy from policy.py, memory-mapped from disk"""
+    from policy import PolicyTable
+    return PolicyTable(**kwargs)
+
+
+SOLVERS = {
+    'beam': BeamSearchSolver,
+    'dp': DynamicProgrammingSolver,
+    'mip': load_mip_solver,
+    'table': load_policy_table,
+}
+
+# Global Singleton
+solver = BeamSearchSolver()
+
+def use_solver(name, memo_size=0, memo_key=None, **kwargs):
+    """
+    Replaces the global solver with a fresh instance of backend 'name',
+    behind a MemoSolver of memo_size entries if that is nonzero, keyed with
+    the quanta in memo_key (e.g. COARSE_MEMO_KEY; lossless by default).
+    """
+    global solver
+    solver = SOLVERS[name](**kwargs)
+    if memo_size:
+        solver = MemoSolver(solver, max_size=memo_size, **(memo_key or {}))
+    return solver
+
+def solve(playery, playerVelY, pipes, deadline=None):
+    return solver.solve(playery, playerVelY, pipes, deadline)
\ No newline at end of file
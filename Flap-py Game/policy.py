@@ -0,0 +1,326 @@
+# made by Dark_Pho3nix
+"""
+Offline-compiled flap policy.
+The compile step sweeps the discretized state space (bird height, bird
+velocity, offset of the next pipe, its gap height and optionally the next
+gap's) with the dynamic programming solver and stores the flap/glide bit of
+every cell in a bit-packed .npy file. The game memory-maps that file and
+makes each AI decision with one table lookup.
+
+Usage:
+    python policy.py compile [--gap-quantum 2] [--next-gap-quantum 16]
+    python policy.py validate --games 50
+    python flappy.py --solver table
+"""
+
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+import mpc
+from mpc import (BASEY, LOOKAHEAD, MAX_VEL_Y, MIN_VEL_Y, PIPEGAPSIZE, SAFETY_MARGIN,
+                 SCREENWIDTH)
+from sim import PipeRing, next_gap_reach, pipe_reach, pipes_ahead
+
+
+# =============================================================================
+# GRID
+# =============================================================================
+
+POLICY_PATH = 'policy.npy'
+FORMAT_VERSION = 1
+
+# Pipes sit at even x and move 4 px a frame, so a step of 2 misses nothing.
+# X_MIN is the first such x at which a pipe still counts as ahead of the bird.
+X_STEP = 2
+X_MIN = 4
+# Pipes further right than this stay clear of the bird for the whole lookahead;
+# they all share one cell, compiled with the pipe where it spawns
+X_REACH = pipe_reach(LOOKAHEAD, SAFETY_MARGIN)
+X_FAR = SCREENWIDTH + 10
+PIPE_SPACING = SCREENWIDTH // 2
+# The following gap matters once the next pipe is passed within the
+# lookahead (it becomes the target), i.e. while the next pipe is this close
+X_NEXT_GAP = next_gap_reach(LOOKAHEAD)
+
+# Top of the lower pipe, as sim.random_gap_y draws it (plus PIPEGAPSIZE)
+GAP_MIN = int(BASEY * 0.2) + PIPEGAPSIZE
+GAP_COUNT = int(BASEY * 0.6 - PIPEGAPSIZE)
+
+N_ROWS = int(BASEY) + 1
+N_VELS = MAX_VEL_Y - MIN_VEL_Y + 1
+
+
+def grid(gap_quantum=2, next_gap_quantum=16):
+    """Table layout, as stored next to the table in its .json file"""
+    block_bits = N_ROWS * N_VELS
+    x_cells = (X_REACH - X_MIN) // X_STEP + 2  # the last one is "far"
+    return {
+        'version': FORMAT_VERSION,
+        'lookahead': LOOKAHEAD,
+        'x_min': X_MIN,
+        'x_step': X_STEP,
+        'x_reach': X_REACH,
+        'x_cells': x_cells,
+        'gap_quantum': gap_quantum,
+        'gap_cells': math.ceil(GAP_COUNT / gap_quantum),
+        'next_gap_quantum': next_gap_quantum,
+        'next_gap_cells': math.ceil(GAP_COUNT / next_gap_quantum) if next_gap_quantum else 1,
+        # Only the x cells up to X_NEXT_GAP are split by the following gap
+        'next_gap_x_cells': (X_NEXT_GAP - X_MIN) // X_STEP + 1 if next_gap_quantum else 0,
+        'rows': N_ROWS,
+        'vels': N_VELS,
+        # Every (pipe, gap, next gap) cell holds one byte-aligned block of
+        # rows x vels bits
+        'block_bytes': (block_bits + 7) // 8,
+    }
+
+
+def x_blocks(layout, x_cell):
+    """(first block, blocks per gap cell) of one pipe offset cell"""
+    split = layout['next_gap_x_cells']
+    per_gap = layout['next_gap_cells']
+    if x_cell < split:
+        return x_cell * layout['gap_cells'] * per_gap, per_gap
+    return (split * per_gap + x_cell - split) * layout['gap_cells'], 1
+
+
+def gap_of_cell(cell, quantum):
+    return GAP_MIN + min(cell * quantum + quantum // 2, GAP_COUNT - 1)
+
+
+def cell_of_gap(gap_y, quantum, cells):
+    return min(max(int(gap_y - GAP_MIN) // quantum, 0), cells - 1)
+
+
+# =============================================================================
+# COMPILE
+# =============================================================================
+
+_dp = None
+
+
+def compile_x_cell(job):
+    """Packed blocks of every gap cell for one pipe offset cell (in a worker)"""
+    global _dp
+    if _dp is None:
+        _dp = mpc.DynamicProgrammingSolver()
+    layout, x_cell = job
+    if x_cell == layout['x_cells'] - 1:
+        x = X_FAR
+    else:
+        x = layout['x_min'] + x_cell * layout['x_step']
+    _, per_gap = x_blocks(layout, x_cell)
+    blocks = []
+    for gap_cell in range(layout['gap_cells']):
+        gap_y = gap_of_cell(gap_cell, layout['gap_quantum'])
+        for next_cell in range(per_gap):
+            # Without a next-gap axis, assume the next gap at the same height
+            next_y = gap_y
+            if per_gap > 1:
+                next_y = gap_of_cell(next_cell, layout['next_gap_quantum'])
+            pipes = PipeRing()
+            pipes.append(x, gap_y - PIPEGAPSIZE)
+            pipes.append(x + PIPE_SPACING, next_y - PIPEGAPSIZE)
+            bits = np.packbits(_dp.policy(pipes).ravel())
+            blocks.append(bits)
+    return x_cell, np.stack(blocks)
+
+
+def compile_table(path=POLICY_PATH, gap_quantum=2, next_gap_quantum=16, workers=None,
+                  on_progress=None):
+    """
+    Sweeps the whole grid and writes the table to path (plus its .json).
+    A falsy next_gap_quantum leaves the following gap out.
+    """
+    layout = grid(gap_quantum, next_gap_quantum)
+    n_blocks = sum(x_blocks(layout, x_cell)[1] * layout['gap_cells']
+                   for x_cell in range(layout['x_cells']))
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    table = np.lib.format.open_memmap(
+        path + '.tmp', mode='w+', dtype=np.uint8, shape=(n_blocks, layout['block_bytes']))
+    jobs = [(layout, x_cell) for x_cell in range(layout['x_cells'])]
+    with multiprocessing.Pool(workers or os.cpu_count() or 1) as pool:
+        for done, (x_cell, blocks) in enumerate(pool.imap_unordered(compile_x_cell, jobs), 1):
+            first, _ = x_blocks(layout, x_cell)
+            table[first:first + len(blocks)] = blocks
+            if on_progress:
+                on_progress(done, len(jobs))
+    table.flush()
+    del table
+    os.replace(path + '.tmp', path)
+    with open(meta_path(path), 'w') as f:
+        json.dump(layout, f, indent=2)
+    return layout
+
+
+def meta_path(path):
+    return os.path.splitext(path)[0] + '.json'
+
+
+# =============================================================================
+# LOOKUP
+# =============================================================================
+
+class PolicyTable:
+    """
+    Compiled policy, memory-mapped read-only. solve() has the solvers'
+    signature and returns (flap, []) from a single lookup; the deadline is
+    irrelevant and ignored. The table is indexed by the next pipe, so with
+    no pipe ahead of the bird the live DP solver decides instead.
+    """
+
+    def __init__(self, path=POLICY_PATH):
+        try:
+            with open(meta_path(path)) as f:
+                self.layout = json.load(f)
+            self.table = np.load(path, mmap_mode='r')
+        except FileNotFoundError:
+            raise FileNotFoundError("no compiled policy at %s; run 'python policy.py compile'"
+                                    % path) from None
+        layout = self.layout
+        if layout.get('version') != FORMAT_VERSION:
+            raise ValueError('%s was compiled by another version; recompile it' % path)
+        self.x_cells = layout['x_cells']
+        self.gap_quantum = layout['gap_quantum']
+        self.gap_cells = layout['gap_cells']
+        self.next_gap_quantum = layout['next_gap_quantum']
+        self.next_gap_cells = layout['next_gap_cells']
+        self.x_blocks = [x_blocks(layout, x_cell) for x_cell in range(self.x_cells)]
+        self.last_path = []
+        # Every lookup answers for an exhaustive (beamless) sweep of the
+        # compiled lookahead, like the DP solver's last_depth/last_width
+        self.last_depth = layout['lookahead']
+        self.last_width = None
+        self.live = None # created on the first state the table can't index
+
+    def cell(self, playery, playerVelY, pipes):
+        """(block, bit) holding the decision for this state, None without a pipe ahead"""
+        ahead = pipes_ahead(pipes, SAFETY_MARGIN)
+        if not ahead:
+            return None
+        x, gap_y = ahead[0]
+        if x > X_REACH:
+            x_cell = self.x_cells - 1
+        else:
+            x_cell = max(0, int(x - X_MIN) // X_STEP)
+        gap_cell = cell_of_gap(gap_y, self.gap_quantum, self.gap_cells)
+        first, per_gap = self.x_blocks[x_cell]
+        next_cell = 0
+        if per_gap > 1 and len(ahead) > 1:
+            next_cell = cell_of_gap(ahead[1][1], self.next_gap_quantum, self.next_gap_cells)
+        block = first + gap_cell * per_gap + next_cell
+        row = min(max(int(playery), 0), N_ROWS - 1)
+        # The start velocity lies just outside the solvers' range; clamp it
+        vel = min(max(playerVelY, MIN_VEL_Y), MAX_VEL_Y) - MIN_VEL_Y
+        return block, row * N_VELS + vel
+
+    def solve(self, playery, playerVelY, pipes, deadline=None):
+        cell = self.cell(playery, playerVelY, pipes)
+        if cell is None:
+            if self.live is None:
+                self.live = mpc.DynamicProgrammingSolver()
+            return self.live.solve(playery, playerVelY, pipes)
+        block, bit = cell
+        return bool(self.table[block, bit >> 3] >> (7 - (bit & 7)) & 1), []
+
+
+# =============================================================================
+# VALIDATION
+# =============================================================================
+
+def validate(table, live, games=50, max_frames=2000, on_game=None):
+    """
+    Plays seeded games driven by the table and asks the live solver for
+    the same states. Returns survival, scores, agreement and per-decision
+    times of both.
+    """
+    from replay import load_hitmasks
+    from sim import FlappySim
+
+    hitmasks = load_hitmasks(0, 0)
+    survived = agree = decisions = 0
+    scores = []
+    table_time = live_time = 0.0
+    for seed in range(games):
+        sim = FlappySim(rng=random.Random(seed), hitmasks=hitmasks)
+        state = sim.reset()
+        done = False
+        while not done and sim.frame < max_frames:
+            start = time.perf_counter()
+            flap, _ = table.solve(*state)
+            table_time += time.perf_counter() - start
+            start = time.perf_counter()
+            expected, _ = live.solve(*state)
+            live_time += time.perf_counter() - start
+            agree += flap == expected
+            decisions += 1
+            state, _, done = sim.step(flap)
+        survived += not done
+        scores.append(sim.score)
+        if on_game:
+            on_game(seed, sim.score, not done)
+    return {
+        'games': games,
+        'survival_rate': survived / games,
+        'mean_score': sum(scores) / games,
+        'min_score': min(scores),
+        'agreement': agree / decisions,
+        'decisions': decisions,
+        'table_us': table_time / decisions * 1e6,
+        'live_us': live_time / decisions * 1e6,
+    }
+
+
+# =============================================================================
+# COMMAND LINE
+# =============================================================================
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Compile or validate the flap policy table')
+    commands = parser.add_subparsers(dest='command', required=True)
+    build = commands.add_parser('compile', help='sweep the state space and write the table')
+    build.add_argument('--gap-quantum', type=int, default=2, metavar='PX',
+                       help='gap heights per cell (default: %(default)s)')
+    build.add_argument('--next-gap-quantum', type=int, default=16, metavar='PX',
+                       help='following gap heights per cell, 0 to leave the following '
+                            'gap out (default: %(default)s)')
+    build.add_argument('--workers', type=int, default=None,
+                       help='worker processes (default: number of cores)')
+    check = commands.add_parser('validate', help='compare the table with the live solver')
+    check.add_argument('--games', type=int, default=50)
+    check.add_argument('--frames', type=int, default=2000, help='frame cap per game')
+    check.add_argument('--solver', default='dp', choices=sorted(set(mpc.SOLVERS) - {'table'}),
+                       help='live solver to compare with (default: %(default)s)')
+    for sub in (build, check):
+        sub.add_argument('--path', default=POLICY_PATH)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.command == 'compile':
+        start = time.perf_counter()
+        layout = compile_table(
+            args.path, args.gap_quantum, args.next_gap_quantum or None, args.workers,
+            lambda done, total: print('\r%d/%d pipe offsets' % (done, total), end='',
+                                      file=sys.stderr, flush=True))
+        size = os.path.getsize(args.path)
+        print('\nwrote %s: %.1f MB in %.0fs' % (args.path, size / 1e6, time.perf_counter() - start),
+              file=sys.stderr)
+        return layout
+
+    report = validate(PolicyTable(args.path), mpc.SOLVERS[args.solver](), args.games, args.frames)
+    print(json.dumps(report, indent=2))
+    return report
+
+
+if __name__ == '__main__':
+    main()
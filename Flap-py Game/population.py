@@ -0,0 +1,400 @@
+# made by Dark_Pho3nix
+"""
+Population mode: many AI birds flying one shared pipe course.
+Every bird is driven by a controller (a solver backend plus constructor
+settings). Bird state lives in arrays stepped together each frame,
+collisions are checked against the one shared PipeRing, and crashed birds
+are dropped from the arrays so they cost nothing afterwards. flappy.py
+draws a PopulationSim; it also runs headless to compare controllers.
+
+Usage:
+    python population.py beam dp beam:beam_width=4,lookahead=20 --birds 300
+    python flappy.py --population 300 --controller beam --controller dp
+"""
+
+import argparse
+import ast
+from itertools import cycle
+import json
+import random
+import sys
+import time
+
+import numpy as np
+
+import mpc
+from sim import (
+    SCREENWIDTH, SCREENHEIGHT, BASEY, BASE_SHIFT,
+    PLAYER_WIDTH, PLAYER_HEIGHT, PIPE_WIDTH, PIPE_HEIGHT, PLAYER_X,
+    PIPE_VEL_X, PLAYER_START_VEL_Y, PLAYER_MAX_VEL_Y, PLAYER_MIN_VEL_Y,
+    PLAYER_ACC_Y, PLAYER_FLAP_ACC, PLAYER_START_ROT, PLAYER_VEL_ROT,
+    PipeRing, check_crash, create_crash_info, random_gap_y,
+)
+from async_solver import fallback_flap
+
+
+# Birds of one controller start this many pixels above and below the
+# round's start height, evenly spaced, so they don't all fly one path
+START_SPREAD = 60
+
+# Seconds of solve() calls the game allows per frame. Birds start spread
+# out, so early frames need one solve per bird; the birds left when it runs
+# out follow their last plan, or async_solver.fallback_flap() without one
+SOLVE_BUDGET = 0.02
+
+
+# =============================================================================
+# CONTROLLERS
+# =============================================================================
+
+def parse_value(text):
+    """A setting's value as a Python literal (8, 0.5, True), else the string"""
+    try:
+        return ast.literal_eval(text)
+    except (ValueError, SyntaxError):
+        return text
+
+
+class Controller:
+    """
+    One solver setting and the running stats of the birds it drives.
+
+    spec is 'SOLVER' or 'SOLVER:key=value,...', e.g. 'beam:beam_width=8';
+    the settings are passed to the backend's constructor. decisions counts
+    solve() calls and solve_time sums their seconds.
+    """
+
+    def __init__(self, spec):
+        name, _, settings = spec.partition(':')
+        if name not in mpc.SOLVERS:
+            raise ValueError('unknown solver %r (choose from %s)'
+                             % (name, ', '.join(sorted(mpc.SOLVERS))))
+        self.label = spec
+        self.name = name
+        self.kwargs = {}
+        for setting in filter(None, settings.split(',')):
+            key, eq, value = setting.partition('=')
+            if not eq:
+                raise ValueError('expected key=value in %r' % spec)
+            self.kwargs[key.strip()] = parse_value(value.strip())
+        self.decisions = 0
+        self.solve_time = 0.0
+
+    def make_solver(self):
+        return mpc.SOLVERS[self.name](**self.kwargs)
+
+    def solve_ms(self):
+        """Mean milliseconds per solve() call so far"""
+        return self.solve_time * 1e3 / self.decisions if self.decisions else 0.0
+
+
+# =============================================================================
+# SIMULATION
+# =============================================================================
+
+class PopulationSim:
+    """
+    Many birds on one course, following FlappySim's frame logic in 'ai'
+    mode.
+
+    The live birds are rows of the arrays bird (bird id), group (index of
+    its controller), y, vel, rot and stale (frames since it was last
+    solved), with solvers[row] its solver and plans[row] the trajectory its
+    last solve returned.
+    Controllers whose backend keeps state between calls (an incremental
+    beam search, the MIP's warm start) get one solver per bird, the others
+    share one. Crashed rows are removed; group_of, crash_frame, crash_score
+    and ground_crash keep each bird's controller and result by id
+    (crash_frame is -1 while it flies).
+
+    solve_budget caps the seconds of solve() calls in one decide() (None or
+    0: no cap), split evenly across the controllers. Cheap backends (table
+    lookups) fit many more solves in their share than a MIP, but a capped
+    round depends on the machine's speed.
+
+    The pipes, score, base and wing animation are shared. Collisions are
+    tested as rectangles against the pipes first, and pixel-exact with
+    sim.check_crash only for the birds whose box touches one.
+    """
+
+    def __init__(self, controllers, n_birds, seed=None, rng=None, hitmasks=None,
+                 spread=START_SPREAD, solve_budget=None):
+        self.controllers = controllers
+        self.n_birds = n_birds
+        self.rng = rng if rng is not None else random.Random(seed)
+        self.hitmasks = hitmasks
+        self.spread = spread
+        self.solve_budget = solve_budget
+        # n_birds split as evenly as possible, the first controllers get the rest
+        share, extra = divmod(n_birds, len(controllers))
+        self.sizes = [share + (c < extra) for c in range(len(controllers))]
+        self.done = True
+
+    def reset(self, player_y=None, base_x=0, player_index_gen=None):
+        if player_y is None:
+            player_y = int((SCREENHEIGHT - PLAYER_HEIGHT) / 2)
+
+        self.score = 0
+        self.frame = 0
+        self.player_index = 0
+        self.loop_iter = 0
+        self.player_index_gen = player_index_gen or cycle([0, 1, 2, 1])
+        self.base_x = base_x
+
+        self.pipes = PipeRing()
+        self.pipes.append(SCREENWIDTH, random_gap_y(self.rng))
+        self.pipes.append(SCREENWIDTH + SCREENWIDTH / 2, random_gap_y(self.rng))
+
+        # Every controller flies the same set of start heights
+        groups, heights = [], []
+        self.solvers = []
+        for c, (controller, size) in enumerate(zip(self.controllers, self.sizes)):
+            controller.decisions = 0
+            controller.solve_time = 0.0
+            if not size:
+                continue
+            offsets = np.linspace(-self.spread, self.spread, size) if size > 1 else [0]
+            heights += [min(max(int(round(player_y + dy)), 0), int(BASEY) - PLAYER_HEIGHT - 1)
+                        for dy in offsets]
+            groups += [c] * size
+            solver = controller.make_solver()
+            per_bird = getattr(solver, 'incremental', False)
+            self.solvers += [solver] + [controller.make_solver() if per_bird else solver
+                                        for _ in range(size - 1)]
+
+        self.bird = np.arange(self.n_birds)
+        self.group_of = np.array(groups, dtype=np.int64)
+        self.group = self.group_of.copy()
+        self.y = np.array(heights, dtype=np.int64)
+        self.vel = np.full(self.n_birds, PLAYER_START_VEL_Y, dtype=np.int64)
+        self.rot = np.full(self.n_birds, PLAYER_START_ROT, dtype=np.int64)
+        self.stale = np.zeros(self.n_birds, dtype=np.int64)
+        self.plans = [[]] * self.n_birds
+
+        self.crash_score = np.zeros(self.n_birds, dtype=np.int64)
+        self.crash_frame = np.full(self.n_birds, -1, dtype=np.int64)
+        self.ground_crash = np.zeros(self.n_birds, dtype=bool)
+
+        self.done = self.n_birds == 0
+        self.crash_info = None
+
+    def survivors(self):
+        """Live birds per controller"""
+        return np.bincount(self.group, minlength=len(self.controllers))
+
+    def decide(self):
+        """
+        Flap decisions of the live birds, aligned with the arrays. Birds of
+        one controller in the same state get the same answer, so only the
+        first of them is solved. With a solve_budget, each controller solves
+        its longest-waiting birds first; once its share is spent, its other
+        birds take the action that keeps them on their last plan, or
+        async_solver.fallback_flap()'s once that runs out (table lookups
+        return no plan at all).
+        """
+        flap = np.zeros(len(self.bird), dtype=bool)
+        solved = np.zeros(len(self.bird), dtype=bool)
+        ys, vels, groups = self.y.tolist(), self.vel.tolist(), self.group.tolist()
+        stale = self.stale.tolist()
+        answers = {}
+        share = (self.solve_budget or 0) / len(self.controllers)
+        spent = [0.0] * len(self.controllers)
+        for row in np.argsort(-self.stale, kind='stable').tolist():
+            key = (groups[row], ys[row], vels[row])
+            if key not in answers:
+                if share and spent[key[0]] >= share:
+                    # The plan's next height, one step past where it now is
+                    plan, ahead = self.plans[row], stale[row] + 1
+                    if ahead < len(plan):
+                        target = plan[ahead][1]
+                        y_flap = ys[row] + max(vels[row] + PLAYER_FLAP_ACC, PLAYER_MIN_VEL_Y)
+                        y_glide = ys[row] + min(vels[row] + PLAYER_ACC_Y, PLAYER_MAX_VEL_Y)
+                        flap[row] = abs(y_flap - target) < abs(y_glide - target)
+                    else:
+                        flap[row] = fallback_flap(ys[row], vels[row], self.pipes)
+                    continue
+                start = time.perf_counter()
+                answers[key] = self.solvers[row].solve(key[1], key[2], self.pipes)
+                elapsed = time.perf_counter() - start
+                spent[key[0]] += elapsed
+                controller = self.controllers[key[0]]
+                controller.solve_time += elapsed
+                controller.decisions += 1
+            flap[row], self.plans[row] = answers[key]
+            solved[row] = True
+        self.stale = np.where(solved, 0, self.stale + 1)
+        return flap
+
+    def step(self, flap):
+        """
+        Advance one frame with one flap per live bird. Returns (reward,
+        crashed ids, done); done once every bird has crashed.
+        """
+        if self.done:
+            raise RuntimeError('step() called on a finished round; call reset()')
+        flap = np.asarray(flap, dtype=bool)
+
+        # === PHYSICS ===
+        rot = np.where(self.rot > -90, self.rot - PLAYER_VEL_ROT, self.rot)
+        rot[flap] = PLAYER_START_ROT
+        vel = self.vel + np.where(flap, PLAYER_FLAP_ACC, PLAYER_ACC_Y)
+        np.clip(vel, PLAYER_MIN_VEL_Y, PLAYER_MAX_VEL_Y, out=vel)
+        y = self.y + vel
+        self.frame += 1
+
+        # === COLLISIONS ===
+        ground = y + PLAYER_HEIGHT >= BASEY
+        ceiling = y <= 0
+        y[ceiling] = 0
+        vel[ceiling] = 0
+
+        pipe_hit = np.zeros(len(y), dtype=bool)
+        pipes = self.pipes
+        for i in pipes.slots():
+            x = int(pipes.x[i])
+            if not (x < PLAYER_X + PLAYER_WIDTH and PLAYER_X < x + PIPE_WIDTH):
+                continue
+            upper, lower = int(pipes.upper_y[i]), int(pipes.lower_y[i])
+            pipe_hit |= ((y < upper + PIPE_HEIGHT) & (upper < y + PLAYER_HEIGHT)) | \
+                        ((y < lower + PIPE_HEIGHT) & (lower < y + PLAYER_HEIGHT))
+        pipe_hit &= ~ground
+        if self.hitmasks:
+            for row in np.flatnonzero(pipe_hit).tolist():
+                player = {'x': PLAYER_X, 'y': y[row], 'index': self.player_index}
+                pipe_hit[row] = check_crash(player, pipes, self.hitmasks)[0]
+
+        crashed = ground | pipe_hit
+        ids = self.bird[crashed]
+        if len(ids):
+            self.crash_score[ids] = self.score
+            self.crash_frame[ids] = self.frame
+            self.ground_crash[ids] = ground[crashed]
+            if len(ids) == len(y):
+                # The last birds down: report the first of them
+                row = int(np.flatnonzero(crashed)[0])
+                player_y = BASEY - PLAYER_HEIGHT if ground[row] else int(y[row])
+                self.crash_info = create_crash_info(
+                    player_y, bool(ground[row]), self.base_x, pipes.copy(),
+                    self.score, 0 if ground[row] else int(vel[row]), int(rot[row]))
+                self.crash_info['controller'] = self.controllers[self.group[row]].label
+                self.done = True
+            live = ~crashed
+            self.bird, self.group = self.bird[live], self.group[live]
+            y, vel, rot = y[live], vel[live], rot[live]
+            self.stale = self.stale[live]
+            keep = live.tolist()
+            self.solvers = [s for s, k in zip(self.solvers, keep) if k]
+            self.plans = [plan for plan, k in zip(self.plans, keep) if k]
+        self.y, self.vel, self.rot = y, vel, rot
+        if self.done:
+            return 0, ids, True
+
+        # === SCORING ===
+        reward = 0
+        player_mid = PLAYER_X + PLAYER_WIDTH / 2
+        for i in pipes.slots():
+            pipe_mid = pipes.x[i] + PIPE_WIDTH / 2
+            if pipe_mid <= player_mid < pipe_mid + 4:
+                reward += 1
+        self.score += reward
+
+        # === UPDATE STATE ===
+        if (self.loop_iter + 1) % 3 == 0:
+            self.player_index = next(self.player_index_gen)
+        self.loop_iter = (self.loop_iter + 1) % 30
+        self.base_x = -((-self.base_x + 100) % BASE_SHIFT)
+
+        pipes.move(PIPE_VEL_X)
+
+        if 0 < pipes.x[pipes.head] < 5:
+            pipes.append(SCREENWIDTH + 10, random_gap_y(self.rng))
+
+        if pipes.x[pipes.head] < -PIPE_WIDTH:
+            pipes.popleft()
+
+        return reward, ids, False
+
+    def results(self):
+        """Per-controller summary of the round so far"""
+        survivors = self.survivors()
+        # Birds still flying have the course's score so far
+        scores = np.where(self.crash_frame < 0, self.score, self.crash_score)
+        report = []
+        for c, controller in enumerate(self.controllers):
+            own = scores[self.group_of == c]
+            report.append({
+                'controller': controller.label,
+                'birds': len(own),
+                'survivors': int(survivors[c]),
+                'mean_score': float(own.mean()) if len(own) else 0.0,
+                'max_score': int(own.max()) if len(own) else 0,
+                'decisions': controller.decisions,
+                'solve_ms': controller.solve_ms(),
+            })
+        return report
+
+
+# =============================================================================
+# COMMAND LINE
+# =============================================================================
+
+def parse_controller(spec):
+    """argparse type for controller specs"""
+    try:
+        return Controller(spec)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from None
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Fly a population of AI birds on one course')
+    parser.add_argument('controllers', nargs='+', type=parse_controller, metavar='SOLVER[:k=v,...]',
+                        help="controllers, e.g. 'beam' or 'beam:beam_width=8,lookahead=30'")
+    parser.add_argument('--birds', type=int, default=100,
+                        help='birds in total, split evenly across the controllers')
+    parser.add_argument('--seed', type=int, default=0, help='pipe course seed')
+    parser.add_argument('--frames', type=int, default=2000, help='frame cap')
+    parser.add_argument('--spread', type=int, default=START_SPREAD,
+                        help='start heights span this many pixels above and below the middle')
+    parser.add_argument('--solve-budget', type=float, default=0, metavar='MS',
+                        help='milliseconds of solve() calls per frame, the other birds '
+                             'follow their last plan or a simple rule; results then depend '
+                             "on the machine's speed (default: 0, no cap)")
+    args = parser.parse_args(argv)
+    if args.birds < len(args.controllers):
+        parser.error('--birds must be at least the number of controllers')
+    return args
+
+
+def main(argv=None):
+    from replay import load_hitmasks
+
+    args = parse_args(argv)
+    try:
+        population = PopulationSim(args.controllers, args.birds, seed=args.seed,
+                                   hitmasks=load_hitmasks(0, 0), spread=args.spread,
+                                   solve_budget=args.solve_budget / 1e3)
+        population.reset()
+    except (FileNotFoundError, TypeError, ValueError) as e:
+        sys.exit(e)
+
+    start = time.perf_counter()
+    done = population.done
+    while not done and population.frame < args.frames:
+        _, _, done = population.step(population.decide())
+    elapsed = time.perf_counter() - start
+
+    report = {
+        'config': {'birds': args.birds, 'seed': args.seed, 'frames': args.frames,
+                   'spread': args.spread, 'solve_budget_ms': args.solve_budget},
+        'frames': population.frame,
+        'score': population.score,
+        'elapsed': elapsed,
+        'controllers': population.results(),
+    }
+    print(json.dumps(report, indent=2))
+    return report
+
+
+if __name__ == '__main__':
+    main()
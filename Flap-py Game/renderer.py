@@ -0,0 +1,199 @@
+# made by Dark_Pho3nix
+"""
+Dirty-rectangle renderer.
+Screens describe each frame as a background plus an ordered list of
+sprites; the renderer compares it with the previous frame and only
+repaints and pushes the screen regions that actually changed.
+"""
+
+import weakref
+
+import pygame
+
+
+# Color that marks transparent pixels in colorkeyed copies of sprites
+COLORKEY = (255, 0, 255)
+
+
+def colorkey_copy(surface):
+    """
+    Opaque RLE-colorkeyed copy of a per-pixel-alpha surface whose pixels
+    are all either fully opaque or fully transparent, which blits several
+    times faster with identical results; None when that doesn't apply
+    """
+    if not surface.get_flags() & pygame.SRCALPHA:
+        return None
+    mask = pygame.mask.from_surface(surface, 0)
+    if mask.count() != pygame.mask.from_surface(surface, 254).count():
+        return None  # partially transparent pixels need real blending
+    copy = pygame.Surface(surface.get_size()).convert()
+    copy.fill(COLORKEY)
+    copy.blit(surface, (0, 0))
+    copy.set_colorkey(COLORKEY, pygame.RLEACCEL)
+    if pygame.mask.from_surface(copy).count() != mask.count():
+        return None  # the sprite itself uses the key color
+    return copy
+
+
+class DirtyRenderer:
+    """
+    Drop-in for the SCREEN.blit(...) / pygame.display.update() pattern:
+
+        RENDERER.begin(IMAGES['background'])
+        RENDERER.blit(surface, (x, y))       # as many layers as needed
+        RENDERER.lines(color, False, points, width)
+        RENDERER.blits([(surface, (x, y)), ...])   # many sprites, one item
+        RENDERER.end()                       # instead of display.update()
+
+    blit() has Surface.blit's signature, so helpers that draw onto a
+    surface (draw_text_outlined, draw_score_sprites) can draw onto the
+    renderer. A sprite counts as unchanged when the same surface object is
+    drawn at the same position as last frame. Changed, added and removed
+    sprites mark their rects dirty; every sprite touching a dirty region is
+    repainted over freshly restored background, and only the dirty rects
+    are passed to display.update(). A new background, or invalidate(),
+    forces one full redraw. Sprites without partial transparency are drawn
+    from cached colorkey copies (see colorkey_copy).
+
+    full_frames, partial_frames and dirty_pixels count what was pushed.
+    """
+
+    def __init__(self, screen):
+        self.screen = screen
+        self.screen_rect = screen.get_rect()
+        self.background = None
+        self.items = []
+        self.prev_items = None  # None: next frame is a full redraw
+        self.fast_surfaces = weakref.WeakKeyDictionary()
+        self.full_frames = 0
+        self.partial_frames = 0
+        self.dirty_pixels = 0
+
+    def invalidate(self):
+        """Repaint the whole screen next frame (e.g. after drawing on it directly)"""
+        self.prev_items = None
+
+    def begin(self, background):
+        if background is not self.background:
+            self.background = background
+            self.prev_items = None
+        self.items = []
+
+    def blit(self, source, dest, area=None):
+        rect = pygame.Rect(dest[0], dest[1], *(area.size if area else source.get_size()))
+        key = (source, rect.topleft, None if area is None else tuple(area))
+        self.items.append((key, rect.clip(self.screen_rect), self._draw_blit))
+        return rect
+
+    def lines(self, color, closed, points, width=1):
+        points = tuple((int(x), int(y)) for x, y in points)
+        xs = [x for x, y in points]
+        ys = [y for x, y in points]
+        rect = pygame.Rect(min(xs), min(ys), max(xs) - min(xs) + 1, max(ys) - min(ys) + 1)
+        rect.inflate_ip(2 * width, 2 * width)
+        key = ('lines', tuple(color), closed, points, width)
+        self.items.append((key, rect.clip(self.screen_rect), self._draw_lines))
+        return rect
+
+    def blits(self, sequence):
+        """
+        (source, dest) pairs drawn with one Surface.blits call and diffed as
+        a single item covering their union, so a flock of small moving
+        sprites dirties one region instead of being matched sprite by sprite
+        """
+        rects = [pygame.Rect(dest[0], dest[1], *source.get_size()) for source, dest in sequence]
+        if not rects:
+            return None
+        rect = rects[0].unionall(rects[1:])
+        key = ('blits',) + tuple((source, r.topleft) for (source, _), r in zip(sequence, rects))
+        self.items.append((key, rect.clip(self.screen_rect), self._draw_blits))
+        return rect
+
+    def end(self):
+        if self.prev_items is None:
+            self.screen.blit(self.background, (0, 0))
+            for key, rect, draw in self.items:
+                draw(key)
+            pygame.display.update()
+            self.full_frames += 1
+            self.dirty_pixels += self.screen_rect.w * self.screen_rect.h
+        else:
+            dirty, redraw = self._diff()
+            for rect in dirty:
+                self.screen.blit(self.background, rect, rect)
+            for i in redraw:
+                key, rect, draw = self.items[i]
+                draw(key)
+            if dirty:
+                pygame.display.update(dirty)
+            self.partial_frames += 1
+            self.dirty_pixels += sum(r.w * r.h for r in dirty)
+        self.prev_items = self.items
+
+    # =========================================================================
+    # INTERNALS
+    # =========================================================================
+
+    def _diff(self):
+        """Dirty rects and indices of the sprites to repaint (in draw order)"""
+        # Sprites of the previous frame not drawn again unchanged, by source
+        leftover = {}
+        for key, rect, draw in self.prev_items:
+            leftover.setdefault(key, []).append(rect)
+
+        dirty = []
+        redraw = []
+        unchanged = []
+        for i, (key, rect, draw) in enumerate(self.items):
+            if leftover.get(key):
+                leftover[key].pop()
+                unchanged.append(i)
+            else:
+                redraw.append(i)
+                dirty.append(rect)
+        gone = [(key[0], rect) for key, rects in leftover.items() for rect in rects]
+
+        # A moved sprite's old and new rect usually overlap: repaint their
+        # union once instead of both
+        moved = len(redraw)
+        for source, rect in gone:
+            for j in range(moved):
+                if self.items[redraw[j]][0][0] is source and dirty[j].colliderect(rect):
+                    dirty[j] = dirty[j].union(rect)
+                    break
+            else:
+                dirty.append(rect)
+        dirty = [rect for rect in dirty if rect.w and rect.h]
+
+        # Anything overlapping a repainted region has to be repainted in
+        # full, which can in turn dirty more of the screen
+        grown = True
+        while grown and unchanged:
+            grown = False
+            for i in unchanged[:]:
+                rect = self.items[i][1]
+                if rect.w and rect.h and rect.collidelist(dirty) != -1:
+                    unchanged.remove(i)
+                    redraw.append(i)
+                    dirty.append(rect)
+                    grown = True
+
+        return dirty, sorted(redraw)
+
+    def _fast(self, source):
+        fast = self.fast_surfaces.get(source, False)
+        if fast is False:
+            fast = self.fast_surfaces[source] = colorkey_copy(source)
+        return fast or source
+
+    def _draw_blit(self, key):
+        source, dest, area = key
+        self.screen.blit(self._fast(source), dest, area)
+
+    def _draw_blits(self, key):
+        self.screen.blits([(self._fast(source), dest) for source, dest in key[1:]],
+                          doreturn=False)
+
+    def _draw_lines(self, key):
+        _, color, closed, points, width = key
+        pygame.draw.lines(self.screen, color, closed, points, width)
@@ -0,0 +1,174 @@
+# made by Dark_Pho3nix
+"""
+Compact replays of Flap-py rounds and a headless replayer.
+A replay stores everything a round depends on (pipe RNG seed, sprite
+theme, start state) plus one bit per frame for the flap input, so the
+round can be re-executed on sim.FlappySim and checked against the
+recorded score and crash frame.
+
+Usage:
+    python replay.py replays/*.flpr
+"""
+
+from itertools import cycle
+import os
+import struct
+import sys
+import time
+import zlib
+
+import pygame
+
+from sim import FlappySim, PIPES_LIST, PLAYERS_LIST
+
+
+# =============================================================================
+# FILE FORMAT
+# =============================================================================
+
+MAGIC = b'FLPR'
+VERSION = 1
+# magic, version, flags, seed, background, player, pipe, player index order,
+# start y, start base x, frames, score
+HEADER = struct.Struct('<4sBBIBBBBhhII')
+
+FLAG_MANUAL = 1
+FLAG_GROUND_CRASH = 2
+
+
+def pack_bits(bits):
+    packed = bytearray((len(bits) + 7) // 8)
+    for i, bit in enumerate(bits):
+        if bit:
+            packed[i >> 3] |= 1 << (i & 7)
+    return bytes(packed)
+
+
+def unpack_bits(packed, count):
+    return [bool(packed[i >> 3] >> (i & 7) & 1) for i in range(count)]
+
+
+class Replay:
+    """
+    One recorded round.
+
+    theme is the (background, player, pipe) sprite indices, index_order
+    the four bird animation frames in the order the round cycles through
+    them, flaps the per-frame input, and frames/score/ground_crash how the
+    round ended.
+    """
+
+    def __init__(self, seed, theme, index_order, player_y, base_x, game_mode,
+                 flaps, score, ground_crash):
+        self.seed = seed
+        self.theme = tuple(theme)
+        self.index_order = tuple(index_order)
+        self.player_y = player_y
+        self.base_x = base_x
+        self.game_mode = game_mode
+        self.flaps = list(flaps)
+        self.score = score
+        self.ground_crash = ground_crash
+
+    @property
+    def frames(self):
+        return len(self.flaps)
+
+    def to_bytes(self):
+        flags = (FLAG_MANUAL if self.game_mode == 'manual' else 0) | \
+                (FLAG_GROUND_CRASH if self.ground_crash else 0)
+        order = sum(index << (2 * i) for i, index in enumerate(self.index_order))
+        header = HEADER.pack(MAGIC, VERSION, flags, self.seed, *self.theme, order,
+                             int(self.player_y), int(self.base_x), self.frames, self.score)
+        return header + zlib.compress(pack_bits(self.flaps), 9)
+
+    @classmethod
+    def from_bytes(cls, data):
+        (magic, version, flags, seed, background, player, pipe, order,
+         player_y, base_x, frames, score) = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError('not a version %d Flap-py replay' % VERSION)
+        flaps = unpack_bits(zlib.decompress(data[HEADER.size:]), frames)
+        return cls(seed=seed,
+                   theme=(background, player, pipe),
+                   index_order=[order >> (2 * i) & 3 for i in range(4)],
+                   player_y=player_y,
+                   base_x=base_x,
+                   game_mode='manual' if flags & FLAG_MANUAL else 'ai',
+                   flaps=flaps,
+                   score=score,
+                   ground_crash=bool(flags & FLAG_GROUND_CRASH))
+
+    def save(self, directory):
+        """Writes the replay into directory, named after its time and score"""
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, '%s-%s-%d.flpr' % (
+            time.strftime('%Y%m%d-%H%M%S'), self.game_mode, self.score))
+        with open(path, 'wb') as f:
+            f.write(self.to_bytes())
+        return path
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            return cls.from_bytes(f.read())
+
+
+# =============================================================================
+# PLAYBACK
+# =============================================================================
+
+def load_hitmasks(player_idx, pipe_idx):
+    """Hitmasks of a theme, built from the sprite files without a display"""
+    pipe = pygame.image.load(PIPES_LIST[pipe_idx])
+    return {
+        'player': tuple(pygame.mask.from_surface(pygame.image.load(path), 0)
+                        for path in PLAYERS_LIST[player_idx]),
+        'pipe': (pygame.mask.from_surface(pygame.transform.flip(pipe, False, True), 0),
+                 pygame.mask.from_surface(pipe, 0)),
+    }
+
+
+def play(replay, hitmasks=None):
+    """
+    Re-executes a replay. Returns (frames, score, ground_crash) of the
+    replayed round; frames is None if it did not end where the input ends
+    """
+    if hitmasks is None:
+        hitmasks = load_hitmasks(replay.theme[1], replay.theme[2])
+    sim = FlappySim(seed=replay.seed, game_mode=replay.game_mode, hitmasks=hitmasks)
+    sim.reset(player_y=replay.player_y, base_x=replay.base_x,
+              player_index_gen=cycle(replay.index_order))
+
+    for frame, flap in enumerate(replay.flaps, 1):
+        _, _, done = sim.step(flap)
+        if done:
+            end = frame if frame == replay.frames else None
+            return end, sim.score, sim.crash_info['groundCrash']
+    return None, sim.score, False
+
+
+def verify(replay):
+    """True if the replay ends with the recorded crash frame, score and cause"""
+    frames, score, ground_crash = play(replay)
+    return (frames, score, ground_crash) == (replay.frames, replay.score, replay.ground_crash)
+
+
+def main(paths):
+    failed = 0
+    for path in paths:
+        replay = Replay.load(path)
+        start = time.perf_counter()
+        frames, score, ground_crash = play(replay)
+        elapsed = time.perf_counter() - start
+        ok = (frames, score, ground_crash) == (replay.frames, replay.score, replay.ground_crash)
+        failed += not ok
+        print('%s %s: %d frames, score %d%s (%.0f frames/s)' % (
+            'OK  ' if ok else 'FAIL', path, replay.frames, replay.score,
+            '' if ok else ', replayed: frames %s score %d' % (frames, score),
+            replay.frames / elapsed if elapsed else float('inf')))
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,387 @@
+# made by Dark_Pho3nix
+"""
+Headless Flappy Bird simulation core.
+Reproduces the physics, pipe spawning, scoring and collision logic of
+flappy.py's main_game() frame-for-frame without a display, audio or clock.
+"""
+
+from array import array
+import functools
+from itertools import cycle
+import random
+
+
+# =============================================================================
+# GAME CONSTANTS
+# =============================================================================
+
+SCREENWIDTH = 288
+SCREENHEIGHT = 512
+PIPEGAPSIZE = 100
+BASEY = SCREENHEIGHT * 0.79
+
+# Sprite geometry (all bird frames share one size, both pipes share one size)
+PLAYER_WIDTH = 34
+PLAYER_HEIGHT = 24
+PIPE_WIDTH = 52
+PIPE_HEIGHT = 320
+BASE_SHIFT = 336 - SCREENWIDTH  # base.png width - background width
+
+PLAYER_X = int(SCREENWIDTH * 0.2)
+
+# Asset paths, relative to the game directory
+PLAYERS_LIST = (
+    ('assets/sprites/redbird-upflap.png',
+     'assets/sprites/redbird-midflap.png',
+     'assets/sprites/redbird-downflap.png'),
+    ('assets/sprites/bluebird-upflap.png',
+     'assets/sprites/bluebird-midflap.png',
+     'assets/sprites/bluebird-downflap.png'),
+    ('assets/sprites/yellowbird-upflap.png',
+     'assets/sprites/yellowbird-midflap.png',
+     'assets/sprites/yellowbird-downflap.png'),
+)
+
+BACKGROUNDS_LIST = (
+    'assets/sprites/background-day.png',
+    'assets/sprites/background-night.png',
+)
+
+PIPES_LIST = (
+    'assets/sprites/pipe-green.png',
+    'assets/sprites/pipe-red.png',
+)
+
+# Physics
+PIPE_VEL_X = -4
+PLAYER_START_VEL_Y = -9
+PLAYER_MAX_VEL_Y = 10
+PLAYER_MIN_VEL_Y = -8
+PLAYER_ACC_Y = 1
+PLAYER_FLAP_ACC = -14
+PLAYER_START_ROT = 45
+PLAYER_VEL_ROT = 3
+PLAYER_ROT_THR = 20
+
+
+# =============================================================================
+# UTILITY FUNCTIONS
+# =============================================================================
+
+def create_crash_info(player_y, ground_crash, base_x, pipes,
+                      score, player_vel_y, player_rot):
+    return {
+        'y': player_y,
+        'groundCrash': ground_crash,
+        'basex': base_x,
+        'pipes': pipes,
+        'score': score,
+        'playerVelY': player_vel_y,
+        'playerRot': player_rot
+    }
+
+
+def random_gap_y(rng=random):
+    """Top edge of a new pipe pair's gap"""
+    gap_y = rng.randrange(0, int(BASEY * 0.6 - PIPEGAPSIZE))
+    return gap_y + int(BASEY * 0.2)
+
+
+def pipes_ahead(pipes, margin=0):
+    """(x, lower_y) of the pipe pairs the bird, grown by margin, hasn't passed"""
+    return [(x, y) for x, y in pipes.pairs()
+            if x + PIPE_WIDTH >= PLAYER_X - margin]
+
+
+def pipe_reach(lookahead, margin=0):
+    """Pipes further right than this stay clear of the bird for the whole lookahead"""
+    return PLAYER_X + PLAYER_WIDTH + margin - lookahead * PIPE_VEL_X
+
+
+def next_gap_reach(lookahead):
+    """
+    How close the next pipe is once it gets passed within the lookahead,
+    making the gap after it the target
+    """
+    return PLAYER_X - PIPE_WIDTH - (lookahead - 1) * PIPE_VEL_X
+
+
+def rect_clip(rect1, rect2):
+    """Intersection of two (x, y, w, h) rects, same semantics as pygame.Rect.clip"""
+    x1, y1, w1, h1 = rect1
+    x2, y2, w2, h2 = rect2
+    left = max(x1, x2)
+    top = max(y1, y2)
+    right = min(x1 + w1, x2 + w2)
+    bottom = min(y1 + h1, y2 + h2)
+    if right <= left or bottom <= top:
+        return (left, top, 0, 0)
+    return (left, top, right - left, bottom - top)
+
+
+def pixel_collision(rect1, rect2, hitmask1, hitmask2):
+    """
+    Pixel-perfect overlap test on pygame.mask.Mask hitmasks, done as a single
+    mask overlap; a missing hitmask is treated as fully solid
+    """
+    x, y, w, h = rect_clip(rect1, rect2)
+    if w == 0 or h == 0:
+        return False
+    if hitmask1 is None and hitmask2 is None:
+        return True
+
+    if hitmask1 is None:
+        rect1, rect2, hitmask1, hitmask2 = rect2, rect1, hitmask2, hitmask1
+    if hitmask2 is None:
+        # A solid sprite only matters where it overlaps the other one
+        rect2 = (x, y, w, h)
+        hitmask2 = type(hitmask1)((w, h), fill=True)
+
+    offset = (rect2[0] - rect1[0], rect2[1] - rect1[1])
+    return hitmask1.overlap(hitmask2, offset) is not None
+
+
+def check_crash(player, pipes, hitmasks=None):
+    """Returns [crashed, ground_crash] for the player against every pipe pair"""
+    pi = player['index']
+    player_rect = (int(player['x']), int(player['y']), PLAYER_WIDTH, PLAYER_HEIGHT)
+
+    player_mask = hitmasks['player'][pi] if hitmasks else None
+    upper_mask = hitmasks['pipe'][0] if hitmasks else None
+    lower_mask = hitmasks['pipe'][1] if hitmasks else None
+
+    for i in pipes.slots():
+        x = int(pipes.x[i])
+        u_rect = (x, int(pipes.upper_y[i]), PIPE_WIDTH, PIPE_HEIGHT)
+        l_rect = (x, int(pipes.lower_y[i]), PIPE_WIDTH, PIPE_HEIGHT)
+
+        if pixel_collision(player_rect, u_rect, player_mask, upper_mask):
+            return [True, False]
+        if pixel_collision(player_rect, l_rect, player_mask, lower_mask):
+            return [True, False]
+
+    return [False, False]
+
+
+# =============================================================================
+# PIPES
+# =============================================================================
+
+# At most three pipe pairs are on screen at once; one spare slot for safety
+PIPE_SLOTS = 4
+
+
+@functools.lru_cache(maxsize=None)
+def _slot_orders(capacity):
+    """orders[head][count]: live slot indices, oldest first"""
+    return [[tuple((head + i) % capacity for i in range(count))
+             for count in range(capacity + 1)]
+            for head in range(capacity)]
+
+
+class PipeRing:
+    """
+    Fixed-capacity ring buffer of pipe pairs, oldest first.
+
+    x, upper_y and lower_y are columns with one slot per pair: its x, the
+    upper pipe's top (gap top - PIPE_HEIGHT) and the lower pipe's top (gap
+    top + PIPEGAPSIZE). They are float64 array.array buffers, which index
+    faster than NumPy arrays in the sim's scalar loops, and NumPy can wrap
+    them without copying (np.frombuffer) for vectorized work. The live
+    pairs are the len() slots starting at head, wrapping around; slots()
+    lists them oldest first. append() writes one slot and popleft() only
+    moves head, so running the pipes allocates nothing per frame.
+    """
+
+    def __init__(self, capacity=PIPE_SLOTS):
+        self.capacity = capacity
+        self.x = array('d', bytes(8 * capacity))
+        self.upper_y = array('d', bytes(8 * capacity))
+        self.lower_y = array('d', bytes(8 * capacity))
+        self.head = 0
+        self.count = 0
+        self._orders = _slot_orders(capacity)
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        self.head = 0
+        self.count = 0
+
+    def append(self, x, gap_y, pipe_height=PIPE_HEIGHT):
+        if self.count == self.capacity:
+            raise IndexError('PipeRing is full')
+        slot = (self.head + self.count) % self.capacity
+        self.x[slot] = x
+        self.upper_y[slot] = gap_y - pipe_height
+        self.lower_y[slot] = gap_y + PIPEGAPSIZE
+        self.count += 1
+
+    def popleft(self):
+        if not self.count:
+            raise IndexError('PipeRing is empty')
+        self.head = (self.head + 1) % self.capacity
+        self.count -= 1
+
+    def move(self, dx):
+        """Moves every live pair dx pixels horizontally"""
+        x = self.x
+        for i in self._orders[self.head][self.count]:
+            x[i] += dx
+
+    def slots(self):
+        """Slot indices of the live pairs, oldest first"""
+        return self._orders[self.head][self.count]
+
+    def pairs(self):
+        """(x, lower pipe top) of the live pairs, oldest first"""
+        x, lower_y = self.x, self.lower_y
+        return [(x[i], lower_y[i]) for i in self._orders[self.head][self.count]]
+
+    def copy(self):
+        ring = PipeRing(self.capacity)
+        ring.x[:] = self.x
+        ring.upper_y[:] = self.upper_y
+        ring.lower_y[:] = self.lower_y
+        ring.head = self.head
+        ring.count = self.count
+        return ring
+
+
+# =============================================================================
+# SIMULATION
+# =============================================================================
+
+class FlappySim:
+    """
+    Render-free Flappy Bird engine.
+
+    reset() starts a round (drawing its first two pipes), step(flap)
+    advances exactly one main_game frame and returns (state, reward, done)
+    where state is the (player_y, player_vel_y, pipes) tuple the solvers
+    consume (pipes is the sim's PipeRing, updated in place) and reward is
+    the number of pipes passed that frame.
+
+    game_mode selects how a flap is applied: 'ai' adds the flap
+    acceleration to the current velocity, 'manual' sets it (and ignores
+    flaps far above the screen), matching main_game's two input paths.
+    hitmasks follows flappy.HITMASKS (pygame.mask.Mask objects); None means
+    solid rectangles.
+    """
+
+    def __init__(self, seed=None, rng=None, game_mode='ai', hitmasks=None):
+        self.rng = rng if rng is not None else random.Random(seed)
+        self.game_mode = game_mode
+        self.hitmasks = hitmasks
+        self.done = True  # no round in progress until reset()
+
+    def reset(self, player_y=None, base_x=0, player_index_gen=None):
+        """Start a new round, mirroring the state main_game sets up"""
+        if player_y is None:
+            player_y = int((SCREENHEIGHT - PLAYER_HEIGHT) / 2)
+
+        self.score = 0
+        self.frame = 0
+        self.player_index = 0
+        self.loop_iter = 0
+        self.player_index_gen = player_index_gen or cycle([0, 1, 2, 1])
+        self.player_x = PLAYER_X
+        self.player_y = player_y
+        self.base_x = base_x
+
+        self.pipes = PipeRing()
+        self.pipes.append(SCREENWIDTH, random_gap_y(self.rng))
+        self.pipes.append(SCREENWIDTH + SCREENWIDTH / 2, random_gap_y(self.rng))
+
+        self.player_vel_y = PLAYER_START_VEL_Y
+        self.player_rot = PLAYER_START_ROT
+        self.player_flapped = False
+
+        self.flap_applied = False
+        self.done = False
+        self.crash_info = None
+        return self.state()
+
+    def state(self):
+        return (self.player_y, self.player_vel_y, self.pipes)
+
+    def step(self, flap=False):
+        """Advance one frame. Returns (state, reward, done)"""
+        if self.done:
+            raise RuntimeError('step() called on a finished round; call reset()')
+
+        # === INPUT ===
+        self.flap_applied = False
+        if flap:
+            if self.game_mode == 'manual':
+                if self.player_y > -2 * PLAYER_HEIGHT:
+                    self.player_vel_y = PLAYER_FLAP_ACC
+                    self.player_flapped = True
+                    self.flap_applied = True
+            else:
+                self.player_vel_y += PLAYER_FLAP_ACC
+                self.player_flapped = True
+                self.flap_applied = True
+
+        # === PHYSICS ===
+        if self.player_rot > -90:
+            self.player_rot -= PLAYER_VEL_ROT
+
+        if not self.player_flapped:
+            self.player_vel_y += PLAYER_ACC_Y
+
+        if self.player_flapped:
+            self.player_flapped = False
+            self.player_rot = PLAYER_START_ROT
+
+        self.player_vel_y = max(PLAYER_MIN_VEL_Y, min(PLAYER_MAX_VEL_Y, self.player_vel_y))
+        self.player_y += self.player_vel_y
+        self.frame += 1
+
+        # === COLLISIONS ===
+        if self.player_y + PLAYER_HEIGHT >= BASEY:
+            self.player_y = BASEY - PLAYER_HEIGHT
+            return self._crash(True, 0)
+
+        if self.player_y <= 0:
+            self.player_y = 0
+            self.player_vel_y = 0
+
+        crash = check_crash({'x': self.player_x, 'y': self.player_y, 'index': self.player_index},
+                            self.pipes, self.hitmasks)
+        if crash[0]:
+            return self._crash(crash[1], self.player_vel_y)
+
+        # === SCORING ===
+        reward = 0
+        player_mid = self.player_x + PLAYER_WIDTH / 2
+        pipes = self.pipes
+        for i in pipes.slots():
+            pipe_mid = pipes.x[i] + PIPE_WIDTH / 2
+            if pipe_mid <= player_mid < pipe_mid + 4:
+                reward += 1
+        self.score += reward
+
+        # === UPDATE STATE ===
+        if (self.loop_iter + 1) % 3 == 0:
+            self.player_index = next(self.player_index_gen)
+        self.loop_iter = (self.loop_iter + 1) % 30
+        self.base_x = -((-self.base_x + 100) % BASE_SHIFT)
+
+        pipes.move(PIPE_VEL_X)
+
+        if 0 < pipes.x[pipes.head] < 5:
+            pipes.append(SCREENWIDTH + 10, random_gap_y(self.rng))
+
+        if pipes.x[pipes.head] < -PIPE_WIDTH:
+            pipes.popleft()
+
+        return self.state(), reward, False
+
+    def _crash(self, ground_crash, player_vel_y):
+        self.done = True
+        self.crash_info = create_crash_info(self.player_y, ground_crash, self.base_x,
+                                            self.pipes.copy(),
+                                            self.score, player_vel_y, self.player_rot)
+        return self.state(), 0, True
@@ -0,0 +1,202 @@
+# made by Dark_Pho3nix
+"""
+Hyperparameter search for the beam search solver.
+Samples settings of beam width, lookahead, velocity penalty and safety
+margin, plays them on seeded headless games across a process pool and
+drops weak settings early with successive halving. Prints the Pareto
+front of (median score, p99 solve latency) among the finalists, so a
+setting can be picked for the hardware at hand.
+
+Usage:
+    python tune.py --configs 32 --rounds 4 --output tune.json
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+
+import mpc
+from benchmark import git_commit
+from evaluate import Summary, make_pool, play_seed
+
+
+# =============================================================================
+# SEARCH SPACE
+# =============================================================================
+
+BEAM_WIDTHS = (2, 3, 4, 6, 8, 10, 12, 16, 24, 32, 48, 64)
+LOOKAHEAD_RANGE = (10, 60)
+VEL_PENALTY_RANGE = (0.0, 1.5)
+SAFETY_MARGIN_RANGE = (0, 4)
+
+
+def default_config():
+    return {
+        'beam_width': mpc.BEAM_WIDTH,
+        'lookahead': mpc.LOOKAHEAD,
+        'vel_penalty': mpc.VEL_PENALTY,
+        'safety_margin': mpc.SAFETY_MARGIN,
+    }
+
+
+def sample_configs(n, rng):
+    """The current defaults plus n - 1 distinct random settings"""
+    configs = [default_config()]
+    seen = {tuple(configs[0].values())}
+    while len(configs) < n:
+        config = {
+            'beam_width': rng.choice(BEAM_WIDTHS),
+            'lookahead': rng.randint(*LOOKAHEAD_RANGE),
+            'vel_penalty': round(rng.uniform(*VEL_PENALTY_RANGE), 2),
+            'safety_margin': rng.randint(*SAFETY_MARGIN_RANGE),
+        }
+        if tuple(config.values()) not in seen:
+            seen.add(tuple(config.values()))
+            configs.append(config)
+    return configs
+
+
+# =============================================================================
+# PARETO RANKING
+# =============================================================================
+
+def objectives(summary):
+    """
+    (median score, p99 solve ms, mean score): higher score and lower
+    latency are better. The mean only breaks ties, since the median often
+    saturates at the frame cap.
+    """
+    stats = summary.to_dict()
+    return stats['score']['p50'], stats['solve_ms']['p99'], stats['score']['mean']
+
+
+def dominates(a, b):
+    return a[0] >= b[0] and a[1] <= b[1] and (a[0] > b[0] or a[1] < b[1])
+
+
+def pareto_front(points):
+    """Indices (keys of 'points') not dominated by any other point"""
+    return [i for i, p in points.items()
+            if not any(dominates(q, p) for j, q in points.items() if j != i)]
+
+
+def select(points, keep):
+    """
+    The 'keep' best indices of 'points': whole Pareto fronts in turn (front,
+    then the front of what is left, ...), the last one cut by score. Ranking
+    by fronts rather than by score alone keeps fast settings in the race.
+    """
+    points = dict(points)
+    chosen = []
+    while points and len(chosen) < keep:
+        front = sorted(pareto_front(points),
+                       key=lambda i: (-points[i][0], -points[i][2], points[i][1]))
+        chosen += front[:keep - len(chosen)]
+        for i in front:
+            del points[i]
+    return chosen
+
+
+# =============================================================================
+# SUCCESSIVE HALVING
+# =============================================================================
+
+def successive_halving(configs, pool, games=4, eta=2, rounds=4, max_frames=2000,
+                       on_round=None):
+    """
+    Round r plays every remaining config on games * eta**r seeds in total
+    (new seeds on top of those it already played), then keeps the best
+    1/eta of them. Returns (summaries, finalists, eliminated_in), where
+    eliminated_in[i] is the round config i was dropped after, or None.
+    """
+    summaries = [Summary() for _ in configs]
+    eliminated_in = [None] * len(configs)
+    alive = list(range(len(configs)))
+    played = 0
+    for r in range(rounds):
+        total = games * eta ** r
+        seeds = range(played, total)
+        owners = [i for i in alive for _ in seeds]
+        jobs = [('beam', seed, max_frames, configs[i]) for i in alive for seed in seeds]
+        for i, game in zip(owners, pool.imap(play_seed, jobs, chunksize=1)):
+            summaries[i].add(game)
+        played = total
+
+        if r == rounds - 1 or len(alive) == 1:
+            break
+        points = {i: objectives(summaries[i]) for i in alive}
+        survivors = select(points, max(1, len(alive) // eta))
+        for i in alive:
+            if i not in survivors:
+                eliminated_in[i] = r
+        alive = sorted(survivors)
+        if on_round:
+            on_round(r, alive, summaries)
+    return summaries, alive, eliminated_in
+
+
+# =============================================================================
+# COMMAND LINE
+# =============================================================================
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Tune the beam search solver')
+    parser.add_argument('--configs', type=int, default=32, help='settings sampled (defaults included)')
+    parser.add_argument('--games', type=int, default=4, help='games per setting in the first round')
+    parser.add_argument('--eta', type=int, default=2,
+                        help='keep 1/eta of the settings and play eta times more games per round')
+    parser.add_argument('--rounds', type=int, default=4)
+    parser.add_argument('--frames', type=int, default=2000, help='frame cap per game')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='worker processes (default: number of cores)')
+    parser.add_argument('--seed', type=int, default=0, help='seed for sampling settings')
+    parser.add_argument('--output', default=None, help='also write the JSON report here')
+    args = parser.parse_args(argv)
+    if args.eta < 2:
+        parser.error('--eta must be at least 2')
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    configs = sample_configs(args.configs, random.Random(args.seed))
+
+    def on_round(r, alive, summaries):
+        print('round %d: %d settings left' % (r, len(alive)), file=sys.stderr, flush=True)
+
+    start = time.perf_counter()
+    with make_pool(args.workers) as pool:
+        summaries, finalists, eliminated_in = successive_halving(
+            configs, pool, args.games, args.eta, args.rounds, args.frames, on_round)
+    elapsed = time.perf_counter() - start
+
+    results = []
+    for i, (config, summary) in enumerate(zip(configs, summaries)):
+        stats = summary.to_dict()
+        results.append(dict(config,
+                            games=stats['games'],
+                            median_score=stats['score']['p50'],
+                            mean_score=stats['score']['mean'],
+                            survival_rate=stats['survival_rate'],
+                            p99_solve_ms=stats['solve_ms']['p99'],
+                            eliminated_after_round=eliminated_in[i]))
+    front = pareto_front({i: objectives(summaries[i]) for i in finalists})
+    report = {
+        'commit': git_commit(),
+        'config': vars(args),
+        'elapsed': elapsed,
+        'pareto_front': sorted((results[i] for i in front), key=lambda r: r['p99_solve_ms']),
+        'results': results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    print(text)
+    return report
+
+
+if __name__ == '__main__':
+    main()